@@ -9,10 +9,21 @@
 #
 
 import argparse
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
 import glob
+import hashlib
+import io
+import json
+import mmap
 import os
+import pickle
 import re
 import sys
+import tempfile
+import time
 
 quiet = True
 warnings = 0
@@ -148,10 +159,32 @@ def uniq(items):
     return sorted(set(items))
 
 
+# Conditionals are stored as tuples shared by all identifiers
+# declared under the same preprocessor conditions, so that each
+# distinct set is only kept once and comparing them is cheap
+interned_conditionals = {}
+
+
+def intern_conditionals(conditionals):
+    if conditionals is None or len(conditionals) == 0:
+        return None
+    conditionals = tuple(conditionals)
+    interned = interned_conditionals.get(conditionals)
+    if interned is None:
+        interned = tuple([sys.intern(cond) for cond in conditionals])
+        interned_conditionals[interned] = interned
+    return interned
+
+
 class identifier:
+    # The full libvirt API has thousands of identifiers, which
+    # are also pickled in the parse cache
+    __slots__ = ("name", "header", "module", "type", "info", "extra",
+                 "lineno", "static", "conditionals")
+
     def __init__(self, name, header=None, module=None, type=None, lineno=0,
                  info=None, extra=None, conditionals=None):
-        self.name = name
+        self.name = sys.intern(name)
         self.header = header
         self.module = module
         self.type = type
@@ -159,10 +192,7 @@ class identifier:
         self.extra = extra
         self.lineno = lineno
         self.static = 0
-        if conditionals is None or len(conditionals) == 0:
-            self.conditionals = None
-        else:
-            self.conditionals = conditionals[:]
+        self.conditionals = intern_conditionals(conditionals)
         if self.name == debugsym and not quiet:
             print("=> define %s : %s" % (debugsym, (module, type, info,
                                          extra, conditionals)))
@@ -178,7 +208,7 @@ class identifier:
         if self.extra is not None:
             r = r + " " + repr(self.extra)
         if self.conditionals is not None:
-            r = r + " " + repr(self.conditionals)
+            r = r + " " + repr(self.get_conditionals_list())
         return r
 
     def set_header(self, header):
@@ -203,10 +233,16 @@ class identifier:
         self.static = static
 
     def set_conditionals(self, conditionals):
-        if conditionals is None or len(conditionals) == 0:
-            self.conditionals = None
-        else:
-            self.conditionals = conditionals[:]
+        self.conditionals = intern_conditionals(conditionals)
+
+    def __getstate__(self):
+        return tuple([getattr(self, slot) for slot in self.__slots__])
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+        # unpickling creates new copies of the tuples
+        self.conditionals = intern_conditionals(self.conditionals)
 
     def get_name(self):
         return self.name
@@ -235,6 +271,11 @@ class identifier:
     def get_conditionals(self):
         return self.conditionals
 
+    def get_conditionals_list(self):
+        if self.conditionals is None:
+            return None
+        return list(self.conditionals)
+
     def update(self, header, module, type=None, info=None, extra=None,
                conditionals=None):
         if self.name == debugsym and not quiet:
@@ -416,8 +457,8 @@ class index:
                 if up.conditionals != self.functions[id].conditionals:
                     self.warning("Header condition differs from Function"
                                  " for %s:" % id)
-                    self.warning("  H: %s" % self.functions[id].conditionals)
-                    self.warning("  C: %s" % up.conditionals)
+                    self.warning("  H: %s" % self.functions[id].get_conditionals_list())
+                    self.warning("  C: %s" % up.get_conditionals_list())
                 self.functions[id].update(None, up.module, up.type, up.info,
                                           up.extra)
         #     else:
@@ -451,11 +492,25 @@ class index:
 class CLexer:
     """A lexer for the C language, tokenize the input by reading and
        analyzing it line by line"""
+
+    # Matches the tokens of a line of code, up to the start of
+    # any comment or string literal, which token() handles
+    # separately as they may span multiple lines
+    tokenRegex = re.compile(r"""
+        [ \t]+
+        |(?P<stop>//|/\*|["'])
+        |(?P<ellipsis>\.\.\.)
+        |(?P<sep>[(){}:;,\[\]])
+        |(?P<op>[-+*><=/%&!|.](?:[-+*><=%&!|]|/(?![/*]))*)
+        |(?P<name>[^ \t(){}:;,+\-*/%&!|\[\]=><"']+)
+    """, re.VERBOSE)
+
     def __init__(self, input):
         self.input = input
-        self.tokens = []
+        self.tokens = collections.deque()
         self.line = ""
         self.lineno = 0
+        self.count = 0
 
     def getline(self):
         line = ''
@@ -480,13 +535,123 @@ class CLexer:
         return self.lineno
 
     def push(self, token):
-        self.tokens.insert(0, token)
+        self.tokens.appendleft(token)
 
     def debug(self):
         print("Last token: ", self.last)
-        print("Token queue: ", self.tokens)
+        print("Token queue: ", list(self.tokens))
         print("Line %d end: " % self.lineno, self.line)
 
+    def token(self):
+        while not self.tokens:
+            if self.line == "":
+                line = self.getline()
+            else:
+                line = self.line
+                self.line = ""
+            if line is None:
+                return None
+
+            if line[0] == '#':
+                tokens = [('preproc', word) for word in line.split()]
+
+                # We might have whitespace between the '#' and preproc
+                # macro name, so instead of having a single token element
+                # of '#define' we might end up with '#' and 'define'. This
+                # merges them back together
+                if tokens[0][1] == "#":
+                    tokens[0] = ('preproc', "#" + tokens[1][1])
+                    del tokens[1]
+
+                if tokens[0][1] == "#define" and "(" in tokens[1][1]:
+                    newtokens = [tokens[0]]
+
+                    endArg = tokens[1][1].find(")")
+                    if endArg != -1:
+                        extra = tokens[1][1][endArg + 1:]
+                        name = tokens[1][1][0:endArg + 1]
+                        newtokens.append(('preproc', name))
+                        if extra != "":
+                            newtokens.append(('preproc', extra))
+                    else:
+                        name = tokens[1][1]
+                        for token in tokens[2:]:
+                            if name is not None:
+                                name = name + token[1]
+                                if ")" in token[1]:
+                                    newtokens.append(('preproc', name))
+                                    name = None
+                            else:
+                                newtokens.append(token)
+                    tokens = newtokens
+                self.tokens.extend(tokens)
+                self.count += len(tokens)
+                break
+            if line[0] == '"' or line[0] == "'":
+                quote = line[0]
+                while quote not in line[1:]:
+                    nextline = self.getline()
+                    if nextline is None:
+                        return None
+                    line += nextline
+
+                tok, self.line = line[1:].split(quote, 1)
+                self.count += 1
+                self.last = ('string', tok)
+                return self.last
+
+            if line.startswith("/*"):
+                line = line[2:]
+                tok = ""
+                while True:
+                    i = line.find("*/")
+                    if i != -1:
+                        self.line = line[i + 2:]
+                        line = line[:i - 1]
+                    if tok != "":
+                        tok = tok + "\n"
+                    tok = tok + line
+                    if i != -1:
+                        break
+                    line = self.getline()
+                    if line is None:
+                        return None
+                self.count += 1
+                self.last = ('comment', tok)
+                return self.last
+            if line.startswith("//"):
+                line = line[2:]
+                self.count += 1
+                self.last = ('comment', line)
+                return self.last
+
+            for match in self.tokenRegex.finditer(line):
+                kind = match.lastgroup
+                if kind is None:
+                    continue
+                if kind == "stop":
+                    self.line = line[match.start():]
+                    break
+                if kind == "ellipsis":
+                    kind = "name"
+                self.tokens.append((kind, match.group()))
+            self.count += len(self.tokens)
+
+        tok = self.tokens.popleft()
+        self.last = tok
+        return tok
+
+
+class CLegacyLexer(CLexer):
+    """The original character based lexer, kept to check that
+       CLexer produces the same tokens"""
+    def __init__(self, input):
+        super().__init__(input)
+        self.tokens = []
+
+    def push(self, token):
+        self.tokens.insert(0, token)
+
     def token(self):
         while self.tokens == []:
             if self.line == "":
@@ -635,6 +800,16 @@ class CLexer:
         return tok
 
 
+def lexerTokens(lexer):
+    """Returns all tokens of 'lexer', with the line of each"""
+    tokens = []
+    token = lexer.token()
+    while token is not None:
+        tokens.append((lexer.getlineno(), token))
+        token = lexer.token()
+    return tokens
+
+
 class CParser:
     """The C module parser"""
     def __init__(self, filename, idx=None):
@@ -2069,11 +2244,263 @@ class CParser:
         return self.index
 
 
+def default_jobs():
+    """Returns the default number of parallel jobs, one per CPU"""
+    # os.cpu_count() returns None if the count cannot be determined
+    return os.cpu_count() or 1
+
+
+class profile:
+    """Wall time spent in each phase of the build and parsing each file
+
+    Phases are timed inclusively, so the time of phases which
+    run inside others, such as 'lex' within 'parseGlobal', is
+    counted in both."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = {}
+        self.files = {}
+        self.skipped = set()
+
+    def add(self, name, seconds, calls=1):
+        (total, count) = self.phases.get(name, (0, 0))
+        self.phases[name] = (total + seconds, count + calls)
+
+    def phase(self, name):
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self.timed(name)
+
+    @contextlib.contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def addFile(self, filename, entry, cached):
+        if not self.enabled:
+            return
+        stats = entry["profile"]
+        self.files[filename] = (stats["time"], stats["tokens"], cached)
+        if cached:
+            return
+        self.add("parse", stats["time"])
+        for name, (seconds, calls) in stats["phases"].items():
+            self.add(name, seconds, calls)
+
+    def skipFile(self, filename):
+        if self.enabled:
+            self.skipped.add(filename)
+
+    def report(self, output=sys.stderr):
+        output.write("%-40s %10s %8s\n" % ("Phase", "Time (ms)", "Calls"))
+        for name, (seconds, calls) in sorted(self.phases.items(),
+                                             key=lambda p: (-p[1][0], p[0])):
+            output.write("%-40s %10.1f %8d\n" % (name, seconds * 1000, calls))
+        names = dict([(name, os.path.relpath(name)) for name in self.files])
+        width = max([40] + [len(name) for name in names.values()])
+        output.write("\n%-*s %10s %8s\n" % (width, "File", "Time (ms)", "Tokens"))
+        for name, (seconds, tokens, cached) in sorted(self.files.items(),
+                                                      key=lambda f: (-f[1][0], f[0])):
+            output.write("%-*s %10.1f %8d%s\n" % (
+                width, names[name], seconds * 1000, tokens,
+                cached and " (cached)" or ""))
+        output.write("\n%d files parsed, %d C files skipped as defining no symbols\n" % (
+            len(self.files), len(self.skipped)))
+        for name in sorted(self.skipped):
+            output.write("  %s\n" % os.path.relpath(name))
+
+
+profiler = profile()
+
+
+def timeCalls(func, phases, name):
+    """Wraps 'func' to add the time and count of its outermost
+       calls to phases[name], ignoring recursive calls"""
+    depth = 0
+
+    def wrapper(*args, **kwargs):
+        nonlocal depth
+        if depth > 0:
+            return func(*args, **kwargs)
+        depth += 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            depth -= 1
+            (seconds, calls) = phases.get(name, (0, 0))
+            phases[name] = (seconds + time.perf_counter() - start, calls + 1)
+    return wrapper
+
+
+class parseCache:
+    """A cache of the index parsed from each file
+
+    Entries are kept in memory, so that the modules sharing
+    files only parse them once, and optionally in 'cachedir'
+    so that unchanged files are not parsed again by the next
+    build. An entry is reused if the file still has the same
+    mtime or content, and was parsed by this same script.
+    The messages printed and warnings counted while parsing
+    are recorded too, and replayed whenever the entry is
+    reused, so the output does not depend on the cache."""
+    def __init__(self, cachedir=None):
+        self.cachedir = cachedir
+        self.entries = {}
+        # the files parsed by this run, rather than loaded
+        self.fresh = set()
+        with open(__file__, "rb") as f:
+            self.digest = hashlib.sha256(f.read()).hexdigest()
+
+    def entryPath(self, filename):
+        name = hashlib.sha256(filename.encode("utf-8")).hexdigest()
+        return os.path.join(self.cachedir, name + ".pickle")
+
+    def loadEntry(self, filename):
+        if filename in self.entries:
+            return self.entries[filename]
+        if self.cachedir is None:
+            return None
+        try:
+            with open(self.entryPath(filename), "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+        if entry["digest"] != self.digest:
+            return None
+        self.entries[filename] = entry
+        return entry
+
+    def storeEntry(self, filename, entry):
+        self.entries[filename] = entry
+        if self.cachedir is None:
+            return
+        # All failures are ignored, the cache is only an
+        # optimization. The entry is written to a temporary
+        # file and renamed into place, so an interrupted build
+        # never leaves a truncated entry behind
+        try:
+            os.makedirs(self.cachedir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.cachedir, suffix=".tmp",
+                                             delete=False) as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, self.entryPath(filename))
+        except Exception:
+            pass
+
+    def lookup(self, filename):
+        key = os.path.abspath(filename)
+        entry = self.loadEntry(key)
+        if entry is None:
+            return None
+
+        mtime = os.stat(filename).st_mtime_ns
+        if entry["mtime"] != mtime:
+            with open(filename, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if entry["hash"] != digest:
+                return None
+            entry["mtime"] = mtime
+            self.storeEntry(key, entry)
+        return entry
+
+    def prefetch(self, filenames, jobs):
+        """Parse all files not in the cache, using up to 'jobs' processes"""
+        missing = [f for f in filenames if self.lookup(f) is None]
+        if jobs < 2 or len(missing) < 2:
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            entries = executor.map(parseFile, missing,
+                                   [self.digest] * len(missing),
+                                   [profiler.enabled] * len(missing))
+            for filename, entry in zip(missing, entries):
+                self.storeEntry(os.path.abspath(filename), entry)
+                self.fresh.add(os.path.abspath(filename))
+
+    def parse(self, filename):
+        global warnings
+
+        entry = self.lookup(filename)
+        if entry is None:
+            entry = parseFile(filename, self.digest, profiler.enabled)
+            self.storeEntry(os.path.abspath(filename), entry)
+            self.fresh.add(os.path.abspath(filename))
+        profiler.addFile(filename, entry,
+                         os.path.abspath(filename) not in self.fresh)
+
+        sys.stdout.write(entry["output"])
+        warnings = warnings + entry["warnings"]
+        return pickle.loads(entry["index"])
+
+
+def parseFile(filename, digest, profile=False):
+    """Parse a file into a parseCache entry
+
+    This runs in the worker processes when parsing in
+    parallel, so the messages are captured rather than
+    printed, to be replayed in order by parseCache.parse().
+    If 'profile' is set, the time spent in the main parsing
+    functions is recorded as well"""
+    start = time.perf_counter()
+    mtime = os.stat(filename).st_mtime_ns
+    with open(filename, "rb") as f:
+        hash = hashlib.sha256(f.read()).hexdigest()
+    output = io.StringIO()
+    before = warnings
+    phases = {}
+    try:
+        with contextlib.redirect_stdout(output):
+            parser = CParser(filename)
+            if profile:
+                parser.lexer.token = timeCalls(parser.lexer.token, phases, "lex")
+                for name in ["parseGlobal", "mergeFunctionComment"]:
+                    setattr(parser, name,
+                            timeCalls(getattr(parser, name), phases, name))
+            idx = parser.parse()
+    except BaseException:
+        sys.stdout.write(output.getvalue())
+        raise
+
+    return {
+        "digest": digest,
+        "mtime": mtime,
+        "hash": hash,
+        "index": pickle.dumps(idx, protocol=pickle.HIGHEST_PROTOCOL),
+        "output": output.getvalue(),
+        "warnings": warnings - before,
+        "profile": {
+            "time": time.perf_counter() - start,
+            "tokens": parser.lexer.count,
+            "phases": phases,
+        },
+    }
+
+
+# the C identifiers in the raw bytes of a file
+symbol_regex = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def listFiles(directories):
+    """The C files and headers in 'directories', sorted within
+       each directory"""
+    files = []
+    for directory in directories:
+        files += sorted(glob.glob(directory + "/*.c"))
+        files += sorted(glob.glob(directory + "/*.h"))
+    return files
+
+
 class docBuilder:
     """A documentation builder"""
-    def __init__(self, name, syms, path='.', directories=['.'], includes=[], acls=None):
+    def __init__(self, name, syms, path='.', directories=['.'], includes=[], acls=None,
+                 cache=None, jobs=1, files=None):
         self.name = name
         self.syms = syms
+        self.files = files
         self.path = path
         self.acls = acls
         self.directories = directories
@@ -2088,11 +2515,17 @@ class docBuilder:
         self.modules = {}
         self.headers = {}
         self.versions = {}
+        self.symbols = None
+        self.since = {}
         self.idx = index()
         self.xref = {}
         self.index = {}
         self.basename = name
         self.errors = 0
+        if cache is None:
+            cache = parseCache()
+        self.cache = cache
+        self.jobs = jobs
 
     def warning(self, msg):
         global warnings
@@ -2145,18 +2578,18 @@ class docBuilder:
 
     def scanHeaders(self):
         for header in self.headers.keys():
-            parser = CParser(header)
-            idx = parser.parse()
+            idx = self.cache.parse(header)
             self.headers[header] = idx
-            self.idx.merge(idx)
+            with profiler.phase("merge"):
+                self.idx.merge(idx)
 
     def scanModules(self):
         for module in self.modules.keys():
-            parser = CParser(module)
-            idx = parser.parse()
+            idx = self.cache.parse(module)
             # idx.analyze()
             self.modules[module] = idx
-            self.idx.merge_public(idx)
+            with profiler.phase("merge_public"):
+                self.idx.merge_public(idx)
 
     def scanVersions(self):
         prefix = self.name.upper().replace("-", "_") + "_"
@@ -2196,29 +2629,66 @@ class docBuilder:
                 else:
                     raise Exception("Unexpected line in syms file: %s" % line)
 
+    #
+    # pick the module's C files and headers out of 'files', as
+    # listed by listFiles(), by default from its own directories
+    #
+    def findFiles(self, files=None):
+        if files is None:
+            files = listFiles(self.directories)
+        for file in files:
+            skip = 1
+            for incl in self.includes:
+                if file.find(incl) != -1:
+                    skip = 0
+                    break
+            if skip == 1:
+                continue
+            if file.endswith(".h"):
+                self.headers[file] = None
+            elif self.definesSymbols(file):
+                self.modules[file] = None
+            else:
+                profiler.skipFile(file)
+
+    #
+    # whether the C file may implement one of the symbols of the
+    # .syms file, read by scanVersions(). Only the implementations
+    # of public functions are merged from the C files, so files
+    # which do not even mention one can skip being parsed. The
+    # file is memory mapped and searched for identifiers without
+    # tokenizing it; without symbols every file is kept
+    #
+    def definesSymbols(self, filename):
+        if len(self.versions) == 0:
+            return True
+        if self.symbols is None:
+            self.symbols = set([name.encode() for name in self.versions])
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return not self.symbols.isdisjoint(symbol_regex.findall(data))
+
     def scan(self):
-        for directory in self.directories:
-            files = glob.glob(directory + "/*.c")
-            for file in files:
-                skip = 1
-                for incl in self.includes:
-                    if file.find(incl) != -1:
-                        skip = 0
-                        break
-                if skip == 0:
-                    self.modules[file] = None
-            files = glob.glob(directory + "/*.h")
-            for file in files:
-                skip = 1
-                for incl in self.includes:
-                    if file.find(incl) != -1:
-                        skip = 0
-                        break
-                if skip == 0:
+        with profiler.phase("versions"):
+            self.scanVersions()
+        if self.files is None:
+            self.findFiles()
+        else:
+            # already picked out by findFiles() in app.moduleFiles()
+            for file in self.files:
+                if file.endswith(".h"):
                     self.headers[file] = None
+                else:
+                    self.modules[file] = None
+        # Files are parsed in parallel up front, while merging
+        # their indexes still happens in the sorted order of the
+        # files, so the result does not depend on the jobs
+        with profiler.phase("prefetch"):
+            self.cache.prefetch(list(self.headers) + list(self.modules), self.jobs)
         self.scanHeaders()
         self.scanModules()
-        self.scanVersions()
 
     # Fetch tags from the comment. Only 'Since' supported at the moment.
     # For functions, since tags are on Return comments.
@@ -2250,6 +2720,8 @@ class docBuilder:
 
         if since == "":
             self.warning("Missing 'Since' tag for: " + name)
+        else:
+            self.since[name] = since
         return (since, comment, return_comment)
 
     def modulename_file(self, file):
@@ -2412,7 +2884,6 @@ class docBuilder:
         # Simple way to avoid setting empty version
         version_tag = len(since) > 0 and f" version='{since}'" or ""
 
-        # NB: this is consumed by a regex in 'getAPIFilenames' in hvsupport.pl
         if id.type == "function":
             if name not in self.versions:
                 raise Exception("Missing symbol file entry for '%s'" % name)
@@ -2551,11 +3022,59 @@ class docBuilder:
             output.write("     <exports symbol='%s' type='function'/>\n" % (id))
         output.write("    </file>\n")
 
+    # A compact index of the symbols described by the XML, for
+    # consumers which only need to look up where a symbol is
+    # declared, its version, ACLs or conditionals. It must be
+    # written after the XML, which collects the 'Since' tags
+    def serialize_json(self):
+        filename = "%s/%s-api.json" % (self.path, self.name)
+        if not quiet:
+            print("Saving JSON index %s" % (filename))
+
+        files = {}
+        for file in self.headers.keys():
+            info = self.headers[file].info
+            if info is None:
+                info = {}
+            files[self.modulename_file(file)] = {
+                "summary": info.get("Summary"),
+                "description": info.get("Description"),
+            }
+
+        symbols = {}
+        for kind, dict in [("macro", self.idx.macros),
+                           ("enum", self.idx.enums),
+                           ("typedef", self.idx.typedefs),
+                           ("variable", self.idx.variables),
+                           ("function", self.idx.functions)]:
+            for name in dict.keys():
+                id = dict[name]
+                symbol = {
+                    "type": id.type if kind == "function" else kind,
+                    "conditionals": id.conditionals,
+                }
+                if id.header is not None:
+                    symbol["file"] = self.modulename_file(id.header)
+                if id.module is not None:
+                    symbol["module"] = self.modulename_file(id.module)
+                if name in self.versions:
+                    symbol["version"] = self.versions[name]
+                elif name in self.since:
+                    symbol["version"] = self.since[name]
+                if self.acls and name in self.acls:
+                    symbol["acls"] = self.acls[name][0]
+                    symbol["aclfilters"] = self.acls[name][1]
+                symbols[name] = symbol
+
+        writeFile(filename, json.dumps({"name": self.name, "files": files,
+                                        "symbols": symbols},
+                                       sort_keys=True, separators=(",", ":")) + "\n")
+
     def serialize(self):
         filename = "%s/%s-api.xml" % (self.path, self.name)
         if not quiet:
             print("Saving XML description %s" % (filename))
-        output = open(filename, "w")
+        output = io.StringIO()
         output.write('<?xml version="1.0" encoding="UTF-8"?>\n')
         output.write("<api name='%s'>\n" % self.name)
         output.write("  <files>\n")
@@ -2581,13 +3100,36 @@ class docBuilder:
             self.serialize_function(output, function)
         output.write("  </symbols>\n")
         output.write("</api>\n")
-        output.close()
+        writeFile(filename, output.getvalue())
+
+        with profiler.phase("serialize_json"):
+            self.serialize_json()
 
         if self.errors > 0:
             print("apibuild.py: %d error(s) encountered during generation" % self.errors, file=sys.stderr)
             sys.exit(3)
 
 
+def writeFile(filename, data):
+    """Write 'data' to a temporary file renamed to 'filename' once
+       complete, so that an interrupted build never leaves a
+       truncated description behind"""
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(filename) or ".",
+                                     prefix=os.path.basename(filename) + ".",
+                                     suffix=".tmp", delete=False) as output:
+        try:
+            output.write(data)
+        except BaseException:
+            output.close()
+            os.unlink(output.name)
+            raise
+    # NamedTemporaryFile creates the file private to the user
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(output.name, 0o666 & ~umask)
+    os.replace(output.name, filename)
+
+
 def remoteProcToAPI(remotename: str) -> (str):
     components = remotename.split('_')
     fixednames = []
@@ -2708,20 +3250,36 @@ def remoteProtocolGetAcls(protocolfilename: str) -> {}:
 
 
 class app:
+    def __init__(self, cachedir=None, jobs=1):
+        self.cache = parseCache(cachedir)
+        self.jobs = jobs
+
     def warning(self, msg):
         global warnings
         warnings = warnings + 1
         print(msg)
 
-    def rebuild(self, name, srcdir, builddir):
-        apiacl = None
+    modules = ["libvirt", "libvirt-qemu", "libvirt-lxc", "libvirt-admin"]
+
+    def directories(self, srcdir, builddir):
+        return [srcdir + "/../src",
+                srcdir + "/../src/admin",
+                srcdir + "/../src/util",
+                srcdir + "/../include/libvirt",
+                builddir + "/../include/libvirt"]
 
-        syms = {
+    def syms(self, srcdir):
+        return {
             "libvirt": srcdir + "/../src/libvirt_public.syms",
             "libvirt-qemu": srcdir + "/../src/libvirt_qemu.syms",
             "libvirt-lxc": srcdir + "/../src/libvirt_lxc.syms",
             "libvirt-admin": srcdir + "/../src/admin/libvirt_admin_public.syms",
         }
+
+    def rebuild(self, name, srcdir, builddir, files=None):
+        apiacl = None
+
+        syms = self.syms(srcdir)
         protocols = {
             "libvirt": srcdir + "/../src/remote/remote_protocol.x",
             "libvirt-qemu": srcdir + "/../src/remote/qemu_protocol.x",
@@ -2733,26 +3291,83 @@ class app:
             return None
 
         if protocols[name]:
-            apiacl = remoteProtocolGetAcls(protocols[name])
+            with profiler.phase("acls"):
+                apiacl = remoteProtocolGetAcls(protocols[name])
 
         builder = None
         if glob.glob(srcdir + "/../src/libvirt.c") != []:
             if not quiet:
                 print("Rebuilding API description for %s" % name)
-            dirs = [srcdir + "/../src",
-                    srcdir + "/../src/admin",
-                    srcdir + "/../src/util",
-                    srcdir + "/../include/libvirt",
-                    builddir + "/../include/libvirt"]
-            builder = docBuilder(name, syms[name], builddir, dirs, [], apiacl)
+            dirs = self.directories(srcdir, builddir)
+            builder = docBuilder(name, syms[name], builddir, dirs, [], apiacl,
+                                 self.cache, self.jobs, files)
         else:
             self.warning("rebuild() failed, unable to guess the module")
             return None
         builder.scan()
         builder.analyze()
-        builder.serialize()
+        with profiler.phase("serialize"):
+            builder.serialize()
         return builder
 
+    #
+    # the files scanned for each module, picked out of 'files' as
+    # listed by listFiles(), by default leaving out the C files
+    # defining none of their symbols. Each module's headers come
+    # first, followed by its C files, in the order of 'files'
+    #
+    def moduleFiles(self, srcdir, builddir, files, prefilter=True):
+        found = {}
+        syms = self.syms(srcdir)
+        for name in self.modules:
+            builder = docBuilder(name, syms[name], builddir,
+                                 self.directories(srcdir, builddir))
+            if prefilter:
+                builder.scanVersions()
+            builder.findFiles(files)
+            found[name] = list(builder.headers) + list(builder.modules)
+        return found
+
+    #
+    # rebuild all modules from a single listing of the source
+    # directories and a single parse of the union of their files,
+    # with each module then taking the indexes of its own files
+    # from the cache
+    #
+    def rebuildAll(self, srcdir, builddir):
+        files = self.moduleFiles(srcdir, builddir,
+                                 listFiles(self.directories(srcdir, builddir)))
+        with profiler.phase("prefetch"):
+            self.cache.prefetch(sorted(set().union(*files.values())),
+                                self.jobs)
+        for name in self.modules:
+            self.rebuild(name, srcdir, builddir, files[name])
+
+    #
+    # check that CLexer tokenizes every file scanned for any of
+    # the modules exactly like CLegacyLexer
+    #
+    def checkLexer(self, srcdir, builddir):
+        files = self.moduleFiles(srcdir, builddir,
+                                 listFiles(self.directories(srcdir, builddir)),
+                                 prefilter=False)
+        files = set().union(*files.values())
+        if len(files) == 0:
+            self.warning("checkLexer() failed, no files found")
+            return
+        for filename in sorted(files):
+            with open(filename) as f:
+                want = lexerTokens(CLegacyLexer(f))
+            with open(filename) as f:
+                got = lexerTokens(CLexer(f))
+            if got == want:
+                continue
+            for i in range(min(len(got), len(want)) + 1):
+                if i == len(got) or i == len(want) or got[i] != want[i]:
+                    break
+            self.warning("%s: token %d differs, expected %s, got %s" % (
+                filename, i, want[i:i + 1], got[i:i + 1]))
+
     #
     # for debugging the parser
     #
@@ -2767,19 +3382,44 @@ if __name__ == "__main__":
     parser.add_argument("srcdir", type=str, help="path to docs source dir")
     parser.add_argument("builddir", type=str, help="path to docs build dir")
     parser.add_argument("-d", "--debug", type=str, help="path to source file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not keep parsed files in the build dir")
+    parser.add_argument("--check-lexer", action="store_true",
+                        help="check the lexer against the legacy lexer")
+    parser.add_argument("--profile", action="store_true",
+                        help="report the time spent in each phase and file")
+    parser.add_argument("--profile-output", type=str,
+                        help="also save cProfile stats of the main process")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="number of files to parse in parallel")
 
     args = parser.parse_args()
 
-    app = app()
+    if args.profile or args.profile_output:
+        profiler.enabled = True
+    if args.profile_output:
+        stats = cProfile.Profile()
+        stats.enable()
+
+    cachedir = None
+    if not args.no_cache:
+        cachedir = os.path.join(args.builddir, "apibuild-cache")
+    app = app(cachedir, args.jobs)
 
     if args.debug:
         debug = 1
         app.parse(args.debug)
+    elif args.check_lexer:
+        app.checkLexer(args.srcdir, args.builddir)
     else:
-        app.rebuild("libvirt", args.srcdir, args.builddir)
-        app.rebuild("libvirt-qemu", args.srcdir, args.builddir)
-        app.rebuild("libvirt-lxc", args.srcdir, args.builddir)
-        app.rebuild("libvirt-admin", args.srcdir, args.builddir)
+        with profiler.phase("total"):
+            app.rebuildAll(args.srcdir, args.builddir)
+
+    if args.profile_output:
+        stats.disable()
+        stats.dump_stats(args.profile_output)
+    if profiler.enabled:
+        profiler.report()
 
     if warnings > 0:
         sys.exit(2)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# Runs apibuild.py over the small source tree in DATADIR and
+# compares the API descriptions it writes against the expected
+# ones stored in DATADIR/docs. Set VIR_TEST_REGENERATE_OUTPUT=1
+# to update the expected files instead. It also checks that the
+# C files which define none of the exported symbols are skipped.
+
+import difflib
+import os
+import os.path
+import subprocess
+import sys
+import tempfile
+
+if len(sys.argv) != 3:
+    print("syntax: %s APIBUILD DATADIR" % sys.argv[0], file=sys.stderr)
+    sys.exit(1)
+
+apibuild = os.path.abspath(sys.argv[1])
+datadir = os.path.abspath(sys.argv[2])
+srcdir = os.path.join(datadir, "docs")
+
+modules = ["libvirt", "libvirt-qemu", "libvirt-lxc", "libvirt-admin"]
+
+# relative to DATADIR, as listed by the --profile report
+skipped = ["src/util/virevent.c"]
+
+regenerate = os.environ.get("VIR_TEST_REGENERATE_OUTPUT", "0") == "1"
+
+ok = True
+with tempfile.TemporaryDirectory() as tmpdir:
+    builddir = os.path.join(tmpdir, "docs")
+    os.mkdir(builddir)
+
+    ret = subprocess.run([sys.executable, apibuild, "--no-cache", "-j1",
+                          "--profile", srcdir, builddir],
+                         cwd=datadir, stderr=subprocess.PIPE, text=True)
+    if ret.returncode != 0:
+        sys.stderr.write(ret.stderr)
+        print("%s failed with status %d" % (apibuild, ret.returncode),
+              file=sys.stderr)
+        sys.exit(1)
+
+    # the skipped files are listed last, each indented by two spaces
+    report = ret.stderr.split(" C files skipped as defining no symbols\n")
+    actual = [line.strip() for line in report[-1].splitlines()]
+    if len(report) != 2 or actual != skipped:
+        sys.stderr.write(ret.stderr)
+        print("expected the skipped C files to be %s" % skipped,
+              file=sys.stderr)
+        ok = False
+
+    for module in modules:
+        for suffix in ["-api.xml", "-api.json"]:
+            expectedfile = os.path.join(srcdir, module + suffix)
+            actualfile = os.path.join(builddir, module + suffix)
+
+            with open(actualfile) as fh:
+                actual = fh.read()
+            try:
+                with open(expectedfile) as fh:
+                    expected = fh.read()
+            except FileNotFoundError:
+                expected = ""
+
+            if actual == expected:
+                continue
+
+            if regenerate:
+                with open(expectedfile, "w") as fh:
+                    fh.write(actual)
+                continue
+
+            ok = False
+            sys.stderr.writelines(difflib.unified_diff(
+                expected.splitlines(keepends=True),
+                actual.splitlines(keepends=True),
+                expectedfile, actualfile))
+
+if not ok:
+    sys.exit(1)
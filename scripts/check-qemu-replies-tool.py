@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# Runs qemu-replies-tool.py on each '.replies' file in DATADIR
+# and compares what it prints against the expected output stored
+# in the '.out' file of the same name. Set
+# VIR_TEST_REGENERATE_OUTPUT=1 to update the expected files instead.
+
+import difflib
+import glob
+import os
+import os.path
+import subprocess
+import sys
+
+if len(sys.argv) != 3:
+    print("syntax: %s TOOL DATADIR" % sys.argv[0], file=sys.stderr)
+    sys.exit(1)
+
+tool = os.path.abspath(sys.argv[1])
+datadir = sys.argv[2]
+
+regenerate = os.environ.get("VIR_TEST_REGENERATE_OUTPUT", "0") == "1"
+
+ok = True
+for path in sorted(glob.glob(os.path.join(datadir, "*.replies"))):
+    # run in DATADIR so that the file names printed are relative
+    ret = subprocess.run([sys.executable, tool, os.path.basename(path)],
+                         cwd=datadir, stdout=subprocess.PIPE, text=True)
+    actual = ret.stdout
+
+    expectedfile = path[:-len(".replies")] + ".out"
+    try:
+        with open(expectedfile) as fh:
+            expected = fh.read()
+    except FileNotFoundError:
+        expected = ""
+
+    if actual == expected:
+        continue
+
+    if regenerate:
+        with open(expectedfile, "w") as fh:
+            fh.write(actual)
+        continue
+
+    ok = False
+    sys.stderr.writelines(difflib.unified_diff(
+        expected.splitlines(keepends=True),
+        actual.splitlines(keepends=True),
+        expectedfile, path))
+
+if not ok:
+    sys.exit(1)
@@ -16,6 +16,7 @@
 # License along with this library.  If not, see
 # <http://www.gnu.org/licenses/>.
 
+import json
 import os.path
 import re
 import sys
@@ -78,15 +79,16 @@ for root, dirs, files in os.walk(os.path.join(srcdir, "src")):
 # Map API functions to the header and documentation files they're in
 # so that we can generate proper hyperlinks to their documentation.
 #
-# The function names are grep'd from the XML output of apibuild.py.
+# The function names are loaded from the JSON index written by
+# apibuild.py alongside its XML output.
 def getAPIFilenames(filename):
     files = {}
 
     with open(filename) as fh:
-        for line in fh:
-            res = re.search(r"function name='([^']+)' file='([^']+)'", line)
-            if res is not None:
-                files[res.group(1)] = res.group(2)
+        symbols = json.load(fh)["symbols"]
+    for name, symbol in symbols.items():
+        if symbol["type"] == "function":
+            files[name] = symbol["file"]
 
     if len(files) == 0:
         raise Exception(("No functions found in %s. " +
@@ -96,11 +98,11 @@ def getAPIFilenames(filename):
     return files
 
 
-def parseSymsFile(apisref, prefix, filename, xmlfilename):
+def parseSymsFile(apisref, prefix, filename, indexfilename):
     vers = None
     prevvers = None
 
-    filenames = getAPIFilenames(xmlfilename)
+    filenames = getAPIFilenames(indexfilename)
 
     with open(filename) as fh:
         for line in fh:
@@ -153,15 +155,15 @@ def parseSymsFile(apisref, prefix, filename, xmlfilename):
 apis = {}
 # Get the list of all public APIs and their corresponding version
 parseSymsFile(apis, "LIBVIRT", symslibvirt,
-              os.path.join(builddir, "docs", "libvirt-api.xml"))
+              os.path.join(builddir, "docs", "libvirt-api.json"))
 
 # And the same for the QEMU specific APIs
 parseSymsFile(apis, "LIBVIRT_QEMU", symsqemu,
-              os.path.join(builddir, "docs", "libvirt-qemu-api.xml"))
+              os.path.join(builddir, "docs", "libvirt-qemu-api.json"))
 
 # And the same for the LXC specific APIs
 parseSymsFile(apis, "LIBVIRT_LXC", symslxc,
-              os.path.join(builddir, "docs", "libvirt-lxc-api.xml"))
+              os.path.join(builddir, "docs", "libvirt-lxc-api.json"))
 
 
 # Some special things which aren't public APIs,
@@ -7,11 +7,19 @@
 
 from pathlib import Path
 import argparse
+import concurrent.futures
+import contextlib
+import io
 import json
 import os
+import re
 import sys
 
 
+# whitespace around the JSON values in a 'replies' file
+whitespace = re.compile(r'[ \t\n\r]*')
+
+
 class qrtException(Exception):
     pass
 
@@ -20,44 +28,56 @@ class qmpSchemaException(Exception):
     pass
 
 
-# Load the 'replies' file into a list of (command, reply) tuples of parsed JSON
+# Load the 'replies' file, yielding (command, reply) tuples of parsed JSON.
+# Each JSON value is terminated by an empty line. The file is read at once and
+# each value is decoded in place where it starts, rather than collecting the
+# lines of each value into a new string
 def qemu_replies_load(filename):
-    conv = []
-
     with open(filename, "r") as fh:
-        command = None
-        jsonstr = ''
-
-        try:
-            for line in fh:
-                jsonstr += line
-
-                if line == '\n':
-                    if command is None:
-                        command = json.loads(jsonstr)
-                    else:
-                        conv.append((command, json.loads(jsonstr)))
-                        command = None
+        data = fh.read()
 
-                    jsonstr = ''
+    decoder = json.JSONDecoder()
+    command = None
+    start = 0
 
-            if command is not None and jsonstr != '':
-                conv.append((command, json.loads(jsonstr)))
-                command = None
-                jsonstr = ''
-
-        except json.decoder.JSONDecodeError as je:
-            raise qrtException("JSON error:\n'%s'\nwhile processing snippet:\n'%s'" % (je, jsonstr))
-
-        if command is not None or jsonstr != '':
-            if command is not None:
-                errorstr = json.dumps(command, indent=2)
+    while start < len(data):
+        # find the end of the block of the value, which includes the empty line
+        if data[start] == '\n':
+            end = start + 1
+        else:
+            end = data.find('\n\n', start)
+            if end != -1:
+                end += 2
+            elif command is None:
+                # a command not followed by an empty line is reported as written
+                raise qrtException("replies file error: Missing reply for command:\n'%s'" % data[start:])
             else:
-                errorstr = jsonstr
+                end = len(data)
 
-            raise qrtException("replies file error: Missing reply for command:\n'%s'" % errorstr)
+        try:
+            (value, pos) = decoder.raw_decode(data, whitespace.match(data, start, end).end())
+        except json.decoder.JSONDecodeError:
+            pos = None
+
+        # unless the value spans exactly its block, decode the block on its own
+        # to report the error just like json.loads() does
+        if pos is None or pos > end or whitespace.match(data, pos, end).end() != end:
+            snippet = data[start:end]
+            try:
+                value = json.loads(snippet)
+            except json.decoder.JSONDecodeError as je:
+                raise qrtException("JSON error:\n'%s'\nwhile processing snippet:\n'%s'" % (je, snippet))
+
+        if command is None:
+            command = value
+        else:
+            yield (command, value)
+            command = None
+
+        start = end
 
-    return conv
+    if command is not None:
+        raise qrtException("replies file error: Missing reply for command:\n'%s'" % json.dumps(command, indent=2))
 
 
 # Format the list of (command, reply) tuples into a string and compare it with
@@ -432,7 +452,7 @@ def dump_device_list_properties(conv):
 
 def process_one(filename, args):
     try:
-        conv = qemu_replies_load(filename)
+        conv = list(qemu_replies_load(filename))
         dumped = False
 
         modify_replies(conv)
@@ -469,6 +489,23 @@ def process_one(filename, args):
     return True
 
 
+# Runs 'process_one' in a worker process, returning its output along with the
+# result so that the output of all files is printed in the order of the files
+def process_one_captured(filename, args):
+    output = io.StringIO()
+
+    with contextlib.redirect_stdout(output):
+        ret = process_one(filename, args)
+
+    return (ret, output.getvalue())
+
+
+# Returns the default number of files to process in parallel, one per CPU;
+# os.cpu_count() returns None if the count cannot be determined
+def default_jobs():
+    return os.cpu_count() or 1
+
+
 description = '''A Swiss army knife tool for '.replies' files used by 'qemucapabilitiestest'
 
 This tool is used to validate, programmatically update or inspect the
@@ -476,7 +513,9 @@ This tool is used to validate, programmatically update or inspect the
 
 By default the file(s) passed as positional argument are used. All '.replies'
 files in a directory can be processed by specifying '--repliesdir /path/to/dir'
-argument.
+argument. Multiple files are processed in parallel, as many at once as given
+by '-j' which defaults to the number of CPUs, and the output is printed in
+the order of the files.
 
 The default mode is validation which checks the following:
     - each command has a reply and both are valid JSON
@@ -543,25 +582,48 @@ parser.add_argument('--dump-qom-list-types', action='store_true',
 parser.add_argument('--dump-device-list-properties', action='store_true',
                     help='dump all devices and their properties')
 
-args = parser.parse_args()
+parser.add_argument('-j', '--jobs', type=int, default=default_jobs(),
+                    help='number of files to process in parallel')
+
+
+def main():
+    args = parser.parse_args()
 
-files = []
+    if args.jobs < 1:
+        parser.error("expected a positive number of jobs, got %d" % args.jobs)
 
-if args.replyfiles:
-    files += args.replyfiles
+    files = []
+
+    if args.replyfiles:
+        files += args.replyfiles
+
+    if args.repliesdir:
+        files += sorted(Path(args.repliesdir).glob('*.replies'))
+
+    if len(files) == 0:
+        parser.print_help()
+        sys.exit(1)
+
+    fail = False
+
+    if args.jobs == 1 or len(files) == 1:
+        for file in files:
+            if not process_one(str(file), args):
+                fail = True
+    else:
+        with concurrent.futures.ProcessPoolExecutor(min(args.jobs, len(files))) as executor:
+            futures = [executor.submit(process_one_captured, str(file), args) for file in files]
 
-if args.repliesdir:
-    files += Path(args.repliesdir).glob('*.replies')
+            for future in futures:
+                (ret, output) = future.result()
+                sys.stdout.write(output)
 
-if len(files) == 0:
-    parser.print_help()
-    sys.exit(1)
+                if not ret:
+                    fail = True
 
-fail = False
+    if fail:
+        sys.exit(1)
 
-for file in files:
-    if not process_one(str(file), args):
-        fail = True
 
-if fail:
-    sys.exit(1)
+if __name__ == '__main__':
+    main()
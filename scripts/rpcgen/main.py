@@ -2,87 +2,343 @@
 # SPDX-License-Identifier: LGPL-2.1-or-later
 
 import argparse
+import concurrent.futures
+import contextlib
+import io
 import os
 import sys
 
+from rpcgen.cache import XDRSpecificationCache
 from rpcgen.parser import XDRParser
 from rpcgen.generator import (
+    zero_copy_fields,
     XDRTypeDeclarationGenerator,
     XDRTypeImplementationGenerator,
     XDRMarshallDeclarationGenerator,
     XDRMarshallImplementationGenerator,
+    XDRSizeDeclarationGenerator,
+    XDRSizeImplementationGenerator,
+    XDRPythonCodecGenerator,
+    XDRBenchmarkGenerator,
 )
 
 
+def default_jobs():
+    # os.cpu_count() returns None if the count cannot be determined
+    return os.cpu_count() or 1
+
+
 def parse_cli():
     parser = argparse.ArgumentParser("RPC code generator")
     parser.add_argument(
         "-m",
         "--mode",
-        choices=["header", "source", "repr"],
+        choices=["header", "source", "all", "python", "bench", "repr"],
         help="Output generation mode",
     )
     parser.add_argument(
         "-r", "--header", default=[], action="append", help="Extra headers to include"
     )
-    parser.add_argument("input", default="-", nargs="?", help="XDR input protocol file")
-    parser.add_argument("output", default="-", nargs="?", help="Generated output file")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="Directory for the generated header and source in 'all' mode",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Number of input files to generate concurrently in 'all' mode",
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="Generate inline fast paths for fixed size structs",
+    )
+    parser.add_argument(
+        "--sizes",
+        action="store_true",
+        help="Generate functions computing the encoded size of each type",
+    )
+    parser.add_argument(
+        "--zero-copy",
+        default=[],
+        action="append",
+        metavar="STRUCT.FIELD",
+        help="Decode an opaque or string field as a pointer into the XDR buffer",
+    )
+    parser.add_argument(
+        "-D",
+        "--define",
+        default=[],
+        action="append",
+        metavar="NAME=VALUE",
+        help="Value of a constant defined by C headers, for the Python codec",
+    )
+    parser.add_argument(
+        "--legacy-lexer",
+        action="store_true",
+        help="Use the original character based lexer",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for caching parsed XDR specifications, "
+        + "which are not cached unless given",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the XDR input, bypassing the cache",
+    )
+    parser.add_argument(
+        "files",
+        default=[],
+        nargs="*",
+        metavar="FILE",
+        help="XDR input protocol file and generated output file, "
+        + "or in 'all' mode, one or more XDR input protocol files",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
 
+    for define in args.define:
+        if "=" not in define:
+            parser.error("expected NAME=VALUE for --define, got '%s'" % define)
 
-def main():
-    args = parse_cli()
+    if args.mode == "all":
+        if len(args.files) == 0:
+            parser.error("at least one XDR input protocol file is required")
+        if "-" in args.files:
+            parser.error("reading from stdin is not supported in 'all' mode")
+        names = [os.path.splitext(os.path.basename(f))[0] for f in args.files]
+        if len(set(names)) != len(names):
+            parser.error("input files in 'all' mode must have distinct names")
+        if args.jobs < 1:
+            parser.error("expected a positive number of jobs, got %d" % args.jobs)
+    else:
+        if len(args.files) > 2:
+            parser.error("only 'all' mode accepts multiple input files")
+        args.input = args.files[0] if len(args.files) > 0 else "-"
+        args.output = args.files[1] if len(args.files) > 1 else "-"
 
-    infp = sys.stdin
-    outfp = sys.stdout
-    if args.input != "-":
-        infp = open(args.input, "r")
-    if args.output != "-":
-        # the old genprotocol.pl wrapper would make the
-        # output files mode 0444, which will prevent us
-        # from writing directly do them. Explicitly
-        # unlinking first gets rid of any old possibly
-        # read-only copy
-        #
-        # We can delete this in a few years, once we
-        # know users won't have a previously generated
-        # readonly copy lieing around.
-        try:
-            os.unlink(args.output)
-        except Exception:
-            pass
-        outfp = open(args.output, "w")
-
-    parser = XDRParser(infp)
+    return args
+
+
+# Generates the output in memory, only writing it to 'path'
+# when it differs from the existing file. This keeps the
+# mtime of unchanged files, so that the build system does
+# not recompile everything including them
+@contextlib.contextmanager
+def open_output(path):
+    outfp = io.StringIO()
+    yield outfp
+    data = outfp.getvalue()
+
+    try:
+        with open(path, "r") as fp:
+            if fp.read() == data:
+                return
+    except OSError:
+        pass
+
+    # the old genprotocol.pl wrapper would make the
+    # output files mode 0444, which will prevent us
+    # from writing directly do them. Explicitly
+    # unlinking first gets rid of any old possibly
+    # read-only copy
+    #
+    # We can delete this in a few years, once we
+    # know users won't have a previously generated
+    # readonly copy lieing around.
+    try:
+        os.unlink(path)
+    except Exception:
+        pass
+    with open(path, "w") as fp:
+        fp.write(data)
+
+
+def load_spec(args, infp):
+    data = infp.read()
+
+    cache = None
+    if args.cache_dir is not None and not args.no_cache:
+        cache = XDRSpecificationCache(args.cache_dir)
+        key = cache.key(data)
+        spec = cache.load(key)
+        if spec is not None:
+            return spec
+
+    parser = XDRParser(
+        io.TextIOWrapper(io.BytesIO(data)), legacy_lexer=args.legacy_lexer
+    )
     spec = parser.parse()
 
-    if args.mode == "header":
-        print("/* This file is auto-generated from %s */\n" % args.input, file=outfp)
-        print("#include <rpc/rpc.h>", file=outfp)
-        print('#include "internal.h"', file=outfp)
-        for h in args.header:
-            print('#include "%s"' % h, file=outfp)
+    if cache is not None:
+        cache.store(key, spec)
+    return spec
+
+
+def generate_header(spec, input, headers, outfp, sizes=False, zerocopy=[]):
+    print("/* This file is auto-generated from %s */\n" % input, file=outfp)
+    print("#include <rpc/rpc.h>", file=outfp)
+    print('#include "internal.h"', file=outfp)
+    for h in headers:
+        print('#include "%s"' % h, file=outfp)
+    print("", file=outfp)
+    print("#pragma once\n", file=outfp)
+    generator = XDRTypeDeclarationGenerator(spec, zerocopy=zerocopy)
+    generator.emit(outfp)
+    print("", file=outfp)
+    generator = XDRMarshallDeclarationGenerator(spec)
+    generator.emit(outfp)
+    print("", file=outfp)
+    if sizes:
+        generator = XDRSizeDeclarationGenerator(spec, zerocopy=zerocopy)
+        generator.emit(outfp)
         print("", file=outfp)
-        print("#pragma once\n", file=outfp)
-        generator = XDRTypeDeclarationGenerator(spec)
-        print(generator.visit(), file=outfp)
-        generator = XDRMarshallDeclarationGenerator(spec)
-        print(generator.visit(), file=outfp)
-    elif args.mode == "source":
-        print("/* This file is auto-generated from %s */\n" % args.input, file=outfp)
-        print("#include <config.h>", file=outfp)
-        for h in args.header:
-            print('#include "%s"' % h, file=outfp)
+
+
+def generate_source(
+    spec, input, headers, outfp, inline=False, sizes=False, zerocopy=[]
+):
+    print("/* This file is auto-generated from %s */\n" % input, file=outfp)
+    print("#include <config.h>", file=outfp)
+    for h in headers:
+        print('#include "%s"' % h, file=outfp)
+    print("", file=outfp)
+    generator = XDRTypeImplementationGenerator(spec)
+    generator.emit(outfp)
+    print("", file=outfp)
+    generator = XDRMarshallImplementationGenerator(
+        spec, inline=inline, zerocopy=zerocopy
+    )
+    generator.emit(outfp)
+    print("", file=outfp)
+    if sizes:
+        generator = XDRSizeImplementationGenerator(spec, zerocopy=zerocopy)
+        generator.emit(outfp)
         print("", file=outfp)
-        generator = XDRTypeImplementationGenerator(spec)
-        print(generator.visit(), file=outfp)
-        generator = XDRMarshallImplementationGenerator(spec)
-        print(generator.visit(), file=outfp)
+
+
+def generate_python(spec, input, defines, outfp):
+    print("# This file is auto-generated from %s\n" % input, file=outfp)
+    generator = XDRPythonCodecGenerator(
+        spec, [define.split("=", 1) for define in defines]
+    )
+    generator.emit(outfp)
+
+
+# Writes a program timing the encoding and decoding of
+# every struct, which includes the extra headers for the
+# generated declarations and is linked with the source
+def generate_bench(spec, input, headers, outfp):
+    print("/* This file is auto-generated from %s */\n" % input, file=outfp)
+    print("#include <rpc/rpc.h>", file=outfp)
+    for h in headers:
+        print('#include "%s"' % h, file=outfp)
+    print("", file=outfp)
+    generator = XDRBenchmarkGenerator(spec)
+    generator.emit(outfp)
+    if len(generator.skipped) > 0:
+        print(
+            "warning: %s: not benchmarking structs using types defined elsewhere: %s"
+            % (input, ", ".join(generator.skipped)),
+            file=sys.stderr,
+        )
+
+
+# Each zero-copy field must be defined by one of the inputs,
+# given the zero-copy fields found in each of them
+def check_zero_copy(names, found):
+    for name in names:
+        if not any([name in fields for fields in found]):
+            raise Exception(
+                "Unknown struct '%s' for zero-copy field" % name.partition(".")[0]
+            )
+
+
+# Writes both <name>.h and <name>.c for <name>.x, parsing
+# the input only once. The extra headers are included by
+# the generated header, while the generated source just
+# includes its own header
+def generate_all(args, input):
+    with open(input, "rb") as infp:
+        spec = load_spec(args, infp)
+
+    name = os.path.splitext(os.path.basename(input))[0]
+    header = name + ".h"
+    with open_output(os.path.join(args.output_dir, header)) as outfp:
+        generate_header(spec, input, args.header, outfp, args.sizes, args.zero_copy)
+    with open_output(os.path.join(args.output_dir, name + ".c")) as outfp:
+        generate_source(
+            spec, input, [header], outfp, args.inline, args.sizes, args.zero_copy
+        )
+    return zero_copy_fields(spec, args.zero_copy)
+
+
+def generate(args, spec, outfp):
+    if args.mode == "header":
+        generate_header(
+            spec, args.input, args.header, outfp, args.sizes, args.zero_copy
+        )
+    elif args.mode == "source":
+        generate_source(
+            spec,
+            args.input,
+            args.header,
+            outfp,
+            args.inline,
+            args.sizes,
+            args.zero_copy,
+        )
+    elif args.mode == "python":
+        generate_python(spec, args.input, args.define, outfp)
+    elif args.mode == "bench":
+        generate_bench(spec, args.input, args.header, outfp)
     elif args.mode == "repr":
         print(spec, file=outfp)
     else:
         pass  # Just validates XDR input syntax
 
 
-main()
+def main():
+    args = parse_cli()
+
+    if args.mode == "all":
+        # Each input writes its own pair of files, so the
+        # result does not depend on the order the workers
+        # finish in. Waiting on the results in input order
+        # reports the first failing input, as when running
+        # serially
+        jobs = min(args.jobs, len(args.files))
+        if jobs == 1:
+            found = [generate_all(args, input) for input in args.files]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+                futures = [
+                    executor.submit(generate_all, args, input) for input in args.files
+                ]
+                found = [future.result() for future in futures]
+        check_zero_copy(args.zero_copy, found)
+        return
+
+    infp = sys.stdin.buffer
+    if args.input != "-":
+        infp = open(args.input, "rb")
+
+    spec = load_spec(args, infp)
+    check_zero_copy(args.zero_copy, [zero_copy_fields(spec, args.zero_copy)])
+
+    if args.output == "-":
+        generate(args, spec, sys.stdout)
+    else:
+        with open_output(args.output) as outfp:
+            generate(args, spec, outfp)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,29 @@
 import abc
 
 
+# All nodes use __slots__, since the remote protocol
+# alone parses into many thousands of them
 class XDRSpecification:
+    __slots__ = ("definitions", "constants")
+
     def __init__(self):
         self.definitions = []
+        # Maps the names of constants and enum values to
+        # their integer values, for those whose value is
+        # known from the spec alone
+        self.constants = {}
 
     def __repr__(self):
         return "\n".join([repr(a) for a in self.definitions])
 
 
 class XDRDefinition(abc.ABC):
-    pass
+    __slots__ = ()
 
 
 class XDRDefinitionConstant(XDRDefinition):
+    __slots__ = ("name", "value")
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -25,6 +35,8 @@ class XDRDefinitionConstant(XDRDefinition):
 
 
 class XDRDefinitionTypedef(XDRDefinition):
+    __slots__ = ("decl",)
+
     def __init__(self, decl):
         self.decl = decl
 
@@ -33,6 +45,8 @@ class XDRDefinitionTypedef(XDRDefinition):
 
 
 class XDRDefinitionEnum(XDRDefinition):
+    __slots__ = ("name", "body")
+
     def __init__(self, name, body):
         self.name = name
         self.body = body
@@ -42,6 +56,8 @@ class XDRDefinitionEnum(XDRDefinition):
 
 
 class XDRDefinitionStruct(XDRDefinition):
+    __slots__ = ("name", "body")
+
     def __init__(self, name, body):
         self.name = name
         self.body = body
@@ -51,6 +67,8 @@ class XDRDefinitionStruct(XDRDefinition):
 
 
 class XDRDefinitionUnion(XDRDefinition):
+    __slots__ = ("name", "body")
+
     def __init__(self, name, body):
         self.name = name
         self.body = body
@@ -60,6 +78,8 @@ class XDRDefinitionUnion(XDRDefinition):
 
 
 class XDRDefinitionCEscape(XDRDefinition):
+    __slots__ = ("code",)
+
     def __init__(self, code):
         self.code = code
 
@@ -68,22 +88,30 @@ class XDRDefinitionCEscape(XDRDefinition):
 
 
 class XDRDeclaration(abc.ABC):
+    __slots__ = ("typ", "identifier")
+
     def __init__(self, typ, identifier):
         self.typ = typ
         self.identifier = identifier
 
 
 class XDRDeclarationScalar(XDRDeclaration):
+    __slots__ = ()
+
     def __repr__(self):
         return "scalar:{type=%s,identifier=%s}" % (self.typ, self.identifier)
 
 
 class XDRDeclarationPointer(XDRDeclaration):
+    __slots__ = ()
+
     def __repr__(self):
         return "pointer:{type=%s,identifier=%s}" % (self.typ, self.identifier)
 
 
 class XDRDeclarationFixedArray(XDRDeclaration):
+    __slots__ = ("length",)
+
     def __init__(self, typ, identifier, length):
         super().__init__(typ, identifier)
         self.length = length
@@ -97,6 +125,8 @@ class XDRDeclarationFixedArray(XDRDeclaration):
 
 
 class XDRDeclarationVariableArray(XDRDeclaration):
+    __slots__ = ("maxlength",)
+
     def __init__(self, typ, identifier, maxlength):
         super().__init__(typ, identifier)
         self.maxlength = maxlength
@@ -110,6 +140,8 @@ class XDRDeclarationVariableArray(XDRDeclaration):
 
 
 class XDRType(abc.ABC):
+    __slots__ = ()
+
     def __repr__(self):
         name = self.__class__.__name__
         return name[7:].lower()
@@ -118,68 +150,87 @@ class XDRType(abc.ABC):
         return False
 
 
+# The basic types carry no state, so only a single
+# instance of each is ever created
+class XDRTypeSingleton:
+    __slots__ = ()
+
+    instances = {}
+
+    def __new__(cls):
+        instance = XDRTypeSingleton.instances.get(cls)
+        if instance is None:
+            instance = object.__new__(cls)
+            XDRTypeSingleton.instances[cls] = instance
+        return instance
+
+
 class XDRTypeScalar(XDRType):
+    __slots__ = ()
+
     def is_scalar(self):
         return True
 
 
-class XDRTypeVoid(XDRTypeScalar):
-    pass
+class XDRTypeVoid(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeChar(XDRTypeScalar):
-    pass
+class XDRTypeChar(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeUnsignedChar(XDRTypeScalar):
-    pass
+class XDRTypeUnsignedChar(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeShort(XDRTypeScalar):
-    pass
+class XDRTypeShort(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeUnsignedShort(XDRTypeScalar):
-    pass
+class XDRTypeUnsignedShort(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeInt(XDRTypeScalar):
-    pass
+class XDRTypeInt(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeUnsignedInt(XDRTypeScalar):
-    pass
+class XDRTypeUnsignedInt(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeHyper(XDRTypeScalar):
-    pass
+class XDRTypeHyper(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeUnsignedHyper(XDRTypeScalar):
-    pass
+class XDRTypeUnsignedHyper(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeFloat(XDRTypeScalar):
-    pass
+class XDRTypeFloat(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeDouble(XDRTypeScalar):
-    pass
+class XDRTypeDouble(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeBool(XDRTypeScalar):
-    pass
+class XDRTypeBool(XDRTypeSingleton, XDRTypeScalar):
+    __slots__ = ()
 
 
-class XDRTypeOpaque(XDRType):
-    pass
+class XDRTypeOpaque(XDRTypeSingleton, XDRType):
+    __slots__ = ()
 
 
-class XDRTypeString(XDRType):
-    pass
+class XDRTypeString(XDRTypeSingleton, XDRType):
+    __slots__ = ()
 
 
 class XDRTypeCustom(XDRType):
+    __slots__ = ("identifier", "definition")
+
     def __init__(self, identifier, definition):
         self.identifier = identifier
         self.definition = definition
@@ -199,6 +250,8 @@ class XDRTypeCustom(XDRType):
 
 
 class XDREnumValue:
+    __slots__ = ("name", "value")
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -208,6 +261,8 @@ class XDREnumValue:
 
 
 class XDREnumBody:
+    __slots__ = ("values",)
+
     def __init__(self, values):
         self.values = values
 
@@ -216,6 +271,8 @@ class XDREnumBody:
 
 
 class XDRTypeEnum(XDRTypeScalar):
+    __slots__ = ("body",)
+
     def __init__(self, body):
         self.body = body
 
@@ -224,6 +281,8 @@ class XDRTypeEnum(XDRTypeScalar):
 
 
 class XDRStructBody:
+    __slots__ = ("fields",)
+
     def __init__(self, fields):
         self.fields = fields
 
@@ -232,6 +291,8 @@ class XDRStructBody:
 
 
 class XDRTypeStruct(XDRType):
+    __slots__ = ("body",)
+
     def __init__(self, body):
         self.body = body
 
@@ -240,6 +301,8 @@ class XDRTypeStruct(XDRType):
 
 
 class XDRUnionCase:
+    __slots__ = ("value", "decl")
+
     def __init__(self, value, decl):
         self.value = value
         self.decl = decl
@@ -249,6 +312,8 @@ class XDRUnionCase:
 
 
 class XDRUnionBody:
+    __slots__ = ("discriminator", "cases", "default")
+
     def __init__(self, discriminator, cases, default):
         self.discriminator = discriminator
         self.cases = cases
@@ -263,6 +328,8 @@ class XDRUnionBody:
 
 
 class XDRTypeUnion(XDRType):
+    __slots__ = ("body",)
+
     def __init__(self, body):
         self.body = body
 
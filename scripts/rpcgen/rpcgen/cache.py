@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: LGPL-2.1-or-later
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+
+# On disk cache of parsed XDRSpecification objects, keyed
+# on the content of the XDR protocol file and the rpcgen
+# package sources, so that a change to either invalidates
+# the entry.
+#
+# All failures to read or write the cache are ignored, as
+# it is purely an optimization and the build directory may
+# be read-only.
+class XDRSpecificationCache:
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+    sources_digest = None
+
+    def __init__(self, cachedir, maxsize=DEFAULT_MAX_SIZE):
+        self.cachedir = Path(cachedir)
+        self.maxsize = maxsize
+
+    @classmethod
+    def get_sources_digest(cls):
+        if cls.sources_digest is None:
+            h = hashlib.sha256()
+            for src in sorted(Path(__file__).parent.glob("*.py")):
+                h.update(src.name.encode("utf-8"))
+                h.update(src.read_bytes())
+            cls.sources_digest = h.digest()
+        return cls.sources_digest
+
+    def key(self, data):
+        h = hashlib.sha256()
+        h.update(self.get_sources_digest())
+        h.update(data)
+        return h.hexdigest()
+
+    def path(self, key):
+        return Path(self.cachedir, key + ".pickle")
+
+    def load(self, key):
+        path = self.path(key)
+        try:
+            with path.open("rb") as fp:
+                spec = pickle.load(fp)
+            # Record the hit so eviction drops the least
+            # recently used entries first
+            os.utime(path)
+        except Exception:
+            return None
+        return spec
+
+    def store(self, key, spec):
+        try:
+            self.cachedir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it into
+            # place, since parallel build jobs may race to
+            # store the same entry
+            fp = tempfile.NamedTemporaryFile(
+                dir=self.cachedir, suffix=".tmp", delete=False
+            )
+        except Exception:
+            return
+        try:
+            with fp:
+                pickle.dump(spec, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fp.name, self.path(key))
+        except Exception:
+            try:
+                os.unlink(fp.name)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self):
+        entries = []
+        try:
+            for path in self.cachedir.glob("*.pickle"):
+                st = path.stat()
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            return
+
+        # Keep the most recently used entries, always
+        # retaining the newest even if it alone is larger
+        # than the size limit
+        entries.sort(key=lambda e: e[0], reverse=True)
+        total = 0
+        for i, (_, size, path) in enumerate(entries):
+            total = total + size
+            if i > 0 and total > self.maxsize:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
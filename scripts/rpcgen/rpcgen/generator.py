@@ -8,14 +8,78 @@ from .parser import (
     XDRTypeVoid,
     XDRTypeOpaque,
     XDRTypeCustom,
+    XDRTypeChar,
+    XDRTypeUnsignedChar,
+    XDRTypeShort,
+    XDRTypeUnsignedShort,
+    XDRTypeInt,
+    XDRTypeUnsignedInt,
+    XDRTypeHyper,
+    XDRTypeUnsignedHyper,
+    XDRTypeFloat,
+    XDRTypeDouble,
+    XDRTypeBool,
+    XDRTypeEnum,
+    XDRDefinitionConstant,
+    XDRDefinitionEnum,
+    XDRDefinitionStruct,
+    XDRDefinitionUnion,
     XDRDefinitionTypedef,
+    XDRDeclarationScalar,
     XDRDeclarationFixedArray,
     XDRDeclarationVariableArray,
     XDRDeclarationPointer,
 )
 
 
+# Maps the STRUCT.FIELD names of the zero-copy fields to
+# their maximum length. Only variable length opaque and
+# string fields qualify, whether declared directly or
+# through a typedef. Names of structs which 'spec' does
+# not define are skipped, since with several input files
+# each struct is only defined by one of them
+def zero_copy_fields(spec, names):
+    structs = {}
+    for definition in spec.definitions:
+        if type(definition) is XDRDefinitionStruct:
+            structs[definition.name] = definition
+
+    fields = {}
+    for name in names:
+        structname, _, fieldname = name.partition(".")
+        if structname not in structs:
+            continue
+        decl = None
+        for field in structs[structname].body.fields:
+            if field.identifier == fieldname:
+                decl = field
+        if decl is None:
+            raise Exception("Unknown zero-copy field '%s'" % name)
+
+        while (
+            type(decl) is XDRDeclarationScalar
+            and type(decl.typ) is XDRTypeCustom
+            and type(decl.typ.definition) is XDRDefinitionTypedef
+        ):
+            decl = decl.typ.definition.decl
+        if type(decl) is not XDRDeclarationVariableArray or type(decl.typ) not in [
+            XDRTypeOpaque,
+            XDRTypeString,
+        ]:
+            raise Exception(
+                "Zero-copy field '%s' is not a variable length opaque or string" % name
+            )
+        if decl.maxlength is None:
+            raise Exception("Zero-copy field '%s' must have a maximum length" % name)
+        fields[name] = decl.maxlength
+    return fields
+
+
 class XDRTypeDeclarationGenerator(XDRVisitor):
+    def __init__(self, spec, zerocopy=[]):
+        super().__init__(spec)
+        self.zerocopy = zero_copy_fields(spec, zerocopy)
+
     def visit_definition_cescape(self, obj, indent, context):
         return obj.code + "\n"
 
@@ -45,7 +109,7 @@ class XDRTypeDeclarationGenerator(XDRVisitor):
     def visit_definition_struct(self, obj, indent, context):
         code = (
             "%sstruct %s %s;\n"
-            % (indent, obj.name, self.visit_object(obj.body, indent))
+            % (indent, obj.name, self.visit_object(obj.body, indent, obj.name))
             + "%stypedef struct %s %s;\n" % (indent, obj.name, obj.name)
             + self.generate_cleanup(obj.name, indent)
         )
@@ -151,18 +215,35 @@ class XDRTypeDeclarationGenerator(XDRVisitor):
         return "%s%s = %s" % (indent, obj.name, obj.value)
 
     def visit_enum_body(self, obj, indent, context):
-        code = "{\n"
+        code = ["{\n"]
         for value in obj.values:
-            code = code + self.visit_object(value, indent + "    ") + ",\n"
-        code = code + "%s}" % indent
+            code.append(self.visit_object(value, indent + "    ") + ",\n")
+        code.append("%s}" % indent)
+        return "".join(code)
+
+    # Zero-copy fields point into the XDR receive buffer,
+    # so strings are not NUL terminated and carry their
+    # length like opaque data
+    def generate_zero_copy_declaration(self, obj, indent):
+        code = (
+            "%sstruct {\n" % indent
+            + "%s    u_int %s_len;\n" % (indent, obj.identifier)
+            + "%s    char *%s_val;\n" % (indent, obj.identifier)
+            + "%s} %s" % (indent, obj.identifier)
+        )
         return code
 
     def visit_struct_body(self, obj, indent, context):
-        code = "{\n"
+        code = ["{\n"]
         for value in obj.fields:
-            code = code + self.visit_object(value, indent + "    ") + ";\n"
-        code = code + "%s}" % indent
-        return code
+            if "%s.%s" % (context, value.identifier) in self.zerocopy:
+                code.append(
+                    self.generate_zero_copy_declaration(value, indent + "    ") + ";\n"
+                )
+                continue
+            code.append(self.visit_object(value, indent + "    ") + ";\n")
+        code.append("%s}" % indent)
+        return "".join(code)
 
     def visit_union_case(self, obj, indent, context):
         return self.visit_object(obj.decl, indent)
@@ -172,19 +253,20 @@ class XDRTypeDeclarationGenerator(XDRVisitor):
         if prefix != "":
             prefix = prefix + "_"
 
-        code = (
-            "%s{\n" % indent
-            + "%s    %s;\n" % (indent, self.visit_object(obj.discriminator))
-            + "%s    union {\n" % indent
-        )
+        code = [
+            "%s{\n" % indent,
+            "%s    %s;\n" % (indent, self.visit_object(obj.discriminator)),
+            "%s    union {\n" % indent,
+        ]
         for value in obj.cases:
             if type(value.decl.typ) is XDRTypeVoid:
                 continue
-            code = code + self.visit_object(value, indent + "        ") + ";\n"
+            code.append(self.visit_object(value, indent + "        ") + ";\n")
         if obj.default is not None and type(obj.default.typ) is not XDRTypeVoid:
-            code = code + self.visit_object(obj.default, indent + "        ") + ";\n"
-        code = code + "%s    } %su;\n" % (indent, prefix) + "%s}" % indent
-        return code
+            code.append(self.visit_object(obj.default, indent + "        ") + ";\n")
+        code.append("%s    } %su;\n" % (indent, prefix))
+        code.append("%s}" % indent)
+        return "".join(code)
 
 
 class XDRTypeImplementationGenerator(XDRVisitor):
@@ -237,6 +319,15 @@ class XDRMarshallDeclarationGenerator(XDRVisitor):
 
 
 class XDRMarshallImplementationGenerator(XDRVisitor):
+    # Structs need at least this many fields for an
+    # inline fast path to be worth generating
+    INLINE_MIN_FIELDS = 2
+
+    def __init__(self, spec, inline=False, zerocopy=[]):
+        super().__init__(spec)
+        self.inline = inline
+        self.zerocopy = zero_copy_fields(spec, zerocopy)
+
     def visit_definition_enum(self, obj, indent, context):
         code = (
             "%sbool_t\n" % indent
@@ -342,80 +433,203 @@ class XDRMarshallImplementationGenerator(XDRVisitor):
                 field,
             )
 
-        code = code + "%s        return FALSE;\n" % indent
+        return code + "%s        return FALSE;\n" % indent
+
+    # Decodes the field as a pointer into the XDR buffer
+    # instead of a copy, which requires the whole field
+    # to be present in the buffer, as with xdrmem streams.
+    # Freeing merely forgets the pointer, as the buffer
+    # is owned by the caller
+    def generate_zero_copy_call(self, field, identifier, maxlength, indent):
+        name = "%s.%s" % (field, identifier)
+        code = (
+            "%s    if (xdrs->x_op == XDR_DECODE) {\n" % indent
+            + "%s        if (!xdr_u_int(xdrs, &%s_len))\n" % (indent, name)
+            + "%s            return FALSE;\n" % indent
+            + "%s        if (%s_len > %s)\n" % (indent, name, maxlength)
+            + "%s            return FALSE;\n" % indent
+            + "%s        %s_val = (char *)XDR_INLINE(xdrs, RNDUP(%s_len));\n"
+            % (indent, name, name)
+            + "%s        if (%s_val == NULL)\n" % (indent, name)
+            + "%s            return FALSE;\n" % indent
+            + "%s    } else if (xdrs->x_op == XDR_FREE) {\n" % indent
+            + "%s        %s_val = NULL;\n" % (indent, name)
+            + "%s        %s_len = 0;\n" % (indent, name)
+            + "%s    } else if (!xdr_bytes(xdrs, (char **)&%s_val, " % (indent, name)
+            + "(u_int *) &%s_len, %s)) {\n" % (name, maxlength)
+            + "%s        return FALSE;\n" % indent
+            + "%s    }\n" % indent
+        )
         return code
 
     def visit_definition_union(self, obj, indent, context):
-        code = (
-            "%sbool_t\n" % indent
-            + "%sxdr_%s(XDR *xdrs, %s *objp)\n" % (indent, obj.name, obj.name)
-            + "%s{\n" % indent
-            + self.generate_type_call(
+        code = [
+            "%sbool_t\n" % indent,
+            "%sxdr_%s(XDR *xdrs, %s *objp)\n" % (indent, obj.name, obj.name),
+            "%s{\n" % indent,
+            self.generate_type_call(
                 obj.body.discriminator,
                 "objp->%s" % obj.body.discriminator.identifier,
                 obj.body.discriminator.identifier,
                 embedded=True,
                 indent=indent,
-            )
-            + "%s    switch (objp->%s) {\n"
-            % (indent, obj.body.discriminator.identifier)
-        )
+            ),
+            "%s    switch (objp->%s) {\n" % (indent, obj.body.discriminator.identifier),
+        ]
 
         for case in obj.body.cases:
-            code = (
-                code
-                + "%s    case %s:\n" % (indent, case.value)
-                + self.generate_type_call(
+            code.append("%s    case %s:\n" % (indent, case.value))
+            code.append(
+                self.generate_type_call(
                     case.decl,
                     "objp->%s_u.%s" % (obj.name, case.decl.identifier),
                     obj.name,
                     embedded=True,
                     indent=indent + "    ",
                 )
-                + "%s        break;\n" % indent
             )
+            code.append("%s        break;\n" % indent)
 
-        code = code + "%s    default:\n" % indent
+        code.append("%s    default:\n" % indent)
 
         if obj.body.default is not None:
-            code = (
-                code
-                + self.generate_type_call(
+            code.append(
+                self.generate_type_call(
                     obj.body.default,
                     "objp->%s_u.%s" % (obj.name, obj.body.default.identifier),
                     obj.name,
                     embedded=True,
                     indent=indent + "    ",
                 )
-                + "%s        break;\n" % indent
             )
+            code.append("%s        break;\n" % indent)
         else:
-            code = code + "%s        return FALSE;\n" % indent
-
-        code = (
-            code
-            + "%s    }\n" % indent
-            + "%s    return TRUE;\n" % indent
-            + "%s}\n" % indent
+            code.append("%s        return FALSE;\n" % indent)
+
+        code.append("%s    }\n" % indent)
+        code.append("%s    return TRUE;\n" % indent)
+        code.append("%s}\n" % indent)
+        return "".join(code)
+
+    # Returns the IXDR_{GET,PUT}_* macro suffix to use for
+    # a field of type 'typ' encoded as a single XDR unit,
+    # or None if the type has no such fixed encoding
+    def inline_macro(self, typ):
+        if type(typ) in [XDRTypeChar, XDRTypeShort, XDRTypeInt]:
+            return "INT32"
+        if type(typ) in [XDRTypeUnsignedChar, XDRTypeUnsignedShort, XDRTypeUnsignedInt]:
+            return "U_INT32"
+        if type(typ) is XDRTypeBool:
+            return "BOOL"
+        if type(typ) is XDRTypeCustom:
+            if type(typ.definition) is XDRDefinitionEnum:
+                return "INT32"
+            if (
+                type(typ.definition) is XDRDefinitionTypedef
+                and type(typ.definition.decl) is XDRDeclarationScalar
+            ):
+                return self.inline_macro(typ.definition.decl.typ)
+        return None
+
+    def generate_inline_struct(self, obj, indent):
+        macros = []
+        for field in obj.body.fields:
+            if type(field) is not XDRDeclarationScalar:
+                return None
+            macro = self.inline_macro(field.typ)
+            if macro is None:
+                return None
+            macros.append((field.identifier, macro))
+
+        if len(macros) < self.INLINE_MIN_FIELDS:
+            return None
+
+        code = [
+            "%s    int32_t *buf;\n" % indent,
+            "\n",
+            "%s    if (xdrs->x_op == XDR_ENCODE) {\n" % indent,
+            "%s        buf = XDR_INLINE(xdrs, %d * BYTES_PER_XDR_UNIT);\n"
+            % (indent, len(macros)),
+            "%s        if (buf != NULL) {\n" % indent,
+        ]
+        for identifier, macro in macros:
+            if macro == "BOOL":
+                code.append(
+                    "%s            IXDR_PUT_INT32(buf, (objp->%s ? 1 : 0));\n"
+                    % (indent, identifier)
+                )
+            else:
+                code.append(
+                    "%s            IXDR_PUT_%s(buf, objp->%s);\n"
+                    % (indent, macro, identifier)
+                )
+        code.extend(
+            [
+                "%s            return TRUE;\n" % indent,
+                "%s        }\n" % indent,
+                "%s    } else if (xdrs->x_op == XDR_DECODE) {\n" % indent,
+                "%s        buf = XDR_INLINE(xdrs, %d * BYTES_PER_XDR_UNIT);\n"
+                % (indent, len(macros)),
+                "%s        if (buf != NULL) {\n" % indent,
+            ]
         )
-        return code
+        for identifier, macro in macros:
+            if macro == "BOOL":
+                code.append(
+                    "%s            objp->%s = IXDR_GET_INT32(buf) ? TRUE : FALSE;\n"
+                    % (indent, identifier)
+                )
+            else:
+                code.append(
+                    "%s            objp->%s = IXDR_GET_%s(buf);\n"
+                    % (indent, identifier, macro)
+                )
+        code.extend(
+            [
+                "%s            return TRUE;\n" % indent,
+                "%s        }\n" % indent,
+                "%s    }\n" % indent,
+            ]
+        )
+        return "".join(code)
 
     def visit_definition_struct(self, obj, indent, context):
-        code = (
-            "%sbool_t\n" % indent
-            + "%sxdr_%s(XDR *xdrs, %s *objp)\n" % (indent, obj.name, obj.name)
-            + "%s{\n" % indent
-        )
+        code = [
+            "%sbool_t\n" % indent,
+            "%sxdr_%s(XDR *xdrs, %s *objp)\n" % (indent, obj.name, obj.name),
+            "%s{\n" % indent,
+        ]
+        if self.inline:
+            # Fast path encoding or decoding all fields directly
+            # in the XDR buffer, falling back to the per-field
+            # calls below if the buffer lacks space
+            fastpath = self.generate_inline_struct(obj, indent)
+            if fastpath is not None:
+                code.append(fastpath)
         for field in obj.body.fields:
-            code = code + self.generate_type_call(
-                field,
-                "objp->%s" % field.identifier,
-                field.identifier,
-                embedded=True,
-                indent=indent,
+            name = "%s.%s" % (obj.name, field.identifier)
+            if name in self.zerocopy:
+                code.append(
+                    self.generate_zero_copy_call(
+                        "objp->%s" % field.identifier,
+                        field.identifier,
+                        self.zerocopy[name],
+                        indent,
+                    )
+                )
+                continue
+            code.append(
+                self.generate_type_call(
+                    field,
+                    "objp->%s" % field.identifier,
+                    field.identifier,
+                    embedded=True,
+                    indent=indent,
+                )
             )
-        code = code + "%s    return TRUE;\n" % indent + "%s}\n" % indent
-        return code
+        code.append("%s    return TRUE;\n" % indent)
+        code.append("%s}\n" % indent)
+        return "".join(code)
 
     def visit_definition_typedef(self, obj, indent, context):
         code = "%sbool_t\n" % indent
@@ -509,3 +723,1353 @@ class XDRMarshallImplementationGenerator(XDRVisitor):
 
     def visit_union_case(self, obj, indent, context):
         return self.visit_object(obj.value, indent)
+
+
+class XDRSizeGenerator(XDRVisitor):
+    # Encoded size of the basic types, from RFC 4506
+    BASIC_TYPE_SIZES = {
+        XDRTypeVoid: 0,
+        XDRTypeChar: 4,
+        XDRTypeUnsignedChar: 4,
+        XDRTypeShort: 4,
+        XDRTypeUnsignedShort: 4,
+        XDRTypeInt: 4,
+        XDRTypeUnsignedInt: 4,
+        XDRTypeHyper: 8,
+        XDRTypeUnsignedHyper: 8,
+        XDRTypeFloat: 4,
+        XDRTypeDouble: 8,
+        XDRTypeBool: 4,
+        XDRTypeEnum: 4,
+    }
+
+    def __init__(self, spec, zerocopy=[]):
+        super().__init__(spec)
+        self.zerocopy = zero_copy_fields(spec, zerocopy)
+        self.definitions = {}
+        for definition in spec.definitions:
+            if type(definition) is XDRDefinitionTypedef:
+                self.definitions[definition.decl.identifier] = definition
+            elif type(definition) in [
+                XDRDefinitionEnum,
+                XDRDefinitionStruct,
+                XDRDefinitionUnion,
+            ]:
+                self.definitions[definition.name] = definition
+        self.fixed_sizes = {}
+
+    # A fixed size is a tuple of a constant number of bytes
+    # and a tuple of C expressions for any parts depending
+    # on constants not defined by the spec, which are left
+    # for the C compiler to evaluate. Array lengths are
+    # converted to the same form by size_value()
+    def size_value(self, value):
+        if value[0].isdecimal() or value[0] == "-":
+            if len(value) > 1 and value[0] == "0" and value[1] not in "xX":
+                return (int(value, 8), ())
+            return (int(value, 0), ())
+        if value in self.spec.constants:
+            return (self.spec.constants[value], ())
+        return (0, (value,))
+
+    @staticmethod
+    def size_add(a, b):
+        return (a[0] + b[0], a[1] + b[1])
+
+    @classmethod
+    def size_mul(cls, count, size):
+        if count[1] == ():
+            return (
+                count[0] * size[0],
+                tuple(["%d * %s" % (count[0], term) for term in size[1]]),
+            )
+        return (0, ("%s * %s" % (cls.size_str(count), cls.size_str(size)),))
+
+    @classmethod
+    def size_rndup(cls, size):
+        if size[1] == ():
+            return ((size[0] + 3) // 4 * 4, ())
+        return (0, ("RNDUP(%s)" % cls.size_str(size),))
+
+    @staticmethod
+    def size_str(size):
+        if size[1] == ():
+            return "%d" % size[0]
+        terms = list(size[1])
+        if size[0] != 0:
+            terms.append("%d" % size[0])
+        if len(terms) == 1:
+            return terms[0]
+        return "(%s)" % " + ".join(terms)
+
+    def is_fixed_array_typedef(self, typ):
+        definition = self.definitions.get(typ.identifier)
+        return (
+            type(definition) is XDRDefinitionTypedef
+            and type(definition.decl) is XDRDeclarationFixedArray
+        )
+
+    def type_fixed_size(self, typ):
+        if type(typ) in self.BASIC_TYPE_SIZES:
+            return (self.BASIC_TYPE_SIZES[type(typ)], ())
+        if type(typ) is not XDRTypeCustom:
+            return None
+
+        if typ.identifier not in self.fixed_sizes:
+            definition = self.definitions.get(typ.identifier)
+            self.fixed_sizes[typ.identifier] = self.definition_fixed_size(definition)
+        return self.fixed_sizes[typ.identifier]
+
+    def definition_fixed_size(self, definition):
+        if type(definition) is XDRDefinitionEnum:
+            return (4, ())
+        if type(definition) is XDRDefinitionTypedef:
+            return self.decl_fixed_size(definition.decl)
+        if type(definition) is XDRDefinitionStruct:
+            size = (0, ())
+            for field in definition.body.fields:
+                fieldsize = self.decl_fixed_size(field)
+                if fieldsize is None:
+                    return None
+                size = self.size_add(size, fieldsize)
+            return size
+        if type(definition) is XDRDefinitionUnion:
+            arms = [case.decl for case in definition.body.cases]
+            if definition.body.default is not None:
+                arms.append(definition.body.default)
+            armsizes = set([self.decl_fixed_size(arm) for arm in arms])
+            if None in armsizes or len(armsizes) > 1:
+                return None
+            size = self.decl_fixed_size(definition.body.discriminator)
+            if len(armsizes) == 1:
+                size = self.size_add(size, armsizes.pop())
+            return size
+        return None
+
+    def decl_fixed_size(self, decl):
+        if type(decl.typ) is XDRTypeVoid:
+            return (0, ())
+        if type(decl) is XDRDeclarationScalar:
+            return self.type_fixed_size(decl.typ)
+        if type(decl) is XDRDeclarationFixedArray:
+            length = self.size_value(decl.length)
+            if type(decl.typ) is XDRTypeOpaque:
+                return self.size_rndup(length)
+            elemsize = self.type_fixed_size(decl.typ)
+            if elemsize is None:
+                return None
+            return self.size_mul(length, elemsize)
+        return None
+
+    def size_param(self, name):
+        definition = self.definitions.get(name)
+        if (
+            type(definition) is XDRDefinitionTypedef
+            and type(definition.decl) is XDRDeclarationFixedArray
+        ):
+            return "const %s objp" % name
+        return "const %s *objp" % name
+
+
+class XDRSizeDeclarationGenerator(XDRSizeGenerator):
+    def generate_declaration(self, name, definition, indent):
+        code = []
+        size = self.definition_fixed_size(definition)
+        if size is not None:
+            code.append(
+                "%s#define XDR_%s_SIZE %s\n" % (indent, name, self.size_str(size))
+            )
+        code.append(
+            "%sextern size_t xdr_%s_size(%s);\n" % (indent, name, self.size_param(name))
+        )
+        return "".join(code)
+
+    def visit_definition_struct(self, obj, indent, context):
+        return self.generate_declaration(obj.name, obj, indent)
+
+    def visit_definition_union(self, obj, indent, context):
+        return self.generate_declaration(obj.name, obj, indent)
+
+    def visit_definition_typedef(self, obj, indent, context):
+        return self.generate_declaration(obj.decl.identifier, obj, indent)
+
+
+class XDRSizeImplementationGenerator(XDRSizeGenerator):
+    # 'value' is a C expression for the object being sized,
+    # from which these derive its address and members
+    @staticmethod
+    def value_address(value):
+        if value.startswith("*"):
+            return value[1:]
+        return "&" + value
+
+    @staticmethod
+    def value_member(value, member):
+        if value == "*objp":
+            return "objp->" + member
+        return value + "." + member
+
+    def generate_size_call(self, typ, value):
+        if type(typ) is not XDRTypeCustom:
+            raise Exception("Cannot compute size of anonymous type %s" % typ)
+        if self.is_fixed_array_typedef(typ):
+            return "xdr_%s_size(%s)" % (typ.identifier, value)
+        return "xdr_%s_size(%s)" % (typ.identifier, self.value_address(value))
+
+    def generate_element_size(self, typ, value):
+        elemsize = self.type_fixed_size(typ)
+        if elemsize is not None:
+            return self.size_str(elemsize)
+        return self.generate_size_call(typ, value)
+
+    def generate_size(self, decl, value, indent):
+        size = self.decl_fixed_size(decl)
+        if size is not None:
+            if size == (0, ()):
+                return []
+            return ["%ssize += %s;\n" % (indent, self.size_str(size))]
+
+        if type(decl) is XDRDeclarationScalar:
+            return [
+                "%ssize += %s;\n" % (indent, self.generate_size_call(decl.typ, value))
+            ]
+
+        if type(decl) is XDRDeclarationPointer:
+            return [
+                "%ssize += 4;\n" % indent,
+                "%sif (%s)\n" % (indent, value),
+                "%s    size += %s;\n"
+                % (indent, self.generate_element_size(decl.typ, "*" + value)),
+            ]
+
+        if type(decl) is XDRDeclarationFixedArray:
+            self.index_used = True
+            return [
+                "%sfor (i = 0; i < %s; i++)\n" % (indent, decl.length),
+                "%s    size += %s;\n"
+                % (indent, self.generate_size_call(decl.typ, value + "[i]")),
+            ]
+
+        if type(decl.typ) is XDRTypeString:
+            return [
+                "%ssize += 4 + RNDUP(%s ? strlen(%s) : 0);\n" % (indent, value, value)
+            ]
+
+        length = self.value_member(value, decl.identifier + "_len")
+        if type(decl.typ) is XDRTypeOpaque:
+            return ["%ssize += 4 + RNDUP(%s);\n" % (indent, length)]
+
+        elemsize = self.type_fixed_size(decl.typ)
+        if elemsize is not None:
+            return [
+                "%ssize += 4 + %s * %s;\n" % (indent, length, self.size_str(elemsize))
+            ]
+
+        self.index_used = True
+        elements = self.value_member(value, decl.identifier + "_val")
+        return [
+            "%ssize += 4;\n" % indent,
+            "%sfor (i = 0; i < %s; i++)\n" % (indent, length),
+            "%s    size += %s;\n"
+            % (indent, self.generate_size_call(decl.typ, elements + "[i]")),
+        ]
+
+    def generate_function(self, name, definition, indent, generate_body):
+        size = self.definition_fixed_size(definition)
+        if size is not None:
+            return (
+                "%ssize_t\n" % indent
+                + "%sxdr_%s_size(%s G_GNUC_UNUSED)\n"
+                % (indent, name, self.size_param(name))
+                + "%s{\n" % indent
+                + "%s    return XDR_%s_SIZE;\n" % (indent, name)
+                + "%s}\n" % indent
+            )
+
+        self.index_used = False
+        body = generate_body(indent + "    ")
+
+        code = [
+            "%ssize_t\n" % indent,
+            "%sxdr_%s_size(%s)\n" % (indent, name, self.size_param(name)),
+            "%s{\n" % indent,
+        ]
+        if self.index_used:
+            code.append("%s    size_t i;\n" % indent)
+        code.extend(body)
+        code.append("%s    return size;\n" % indent)
+        code.append("%s}\n" % indent)
+        return "".join(code)
+
+    def visit_definition_struct(self, obj, indent, context):
+        def generate_body(indent):
+            size = (0, ())
+            body = []
+            for field in obj.body.fields:
+                fieldsize = self.decl_fixed_size(field)
+                if "%s.%s" % (obj.name, field.identifier) in self.zerocopy:
+                    body.append(
+                        "%ssize += 4 + RNDUP(objp->%s.%s_len);\n"
+                        % (indent, field.identifier, field.identifier)
+                    )
+                elif fieldsize is not None:
+                    size = self.size_add(size, fieldsize)
+                else:
+                    body.extend(
+                        self.generate_size(field, "objp->%s" % field.identifier, indent)
+                    )
+            return [
+                "%ssize_t size = %s;\n" % (indent, self.size_str(size)),
+                "\n",
+            ] + body
+
+        return self.generate_function(obj.name, obj, indent, generate_body)
+
+    def visit_definition_union(self, obj, indent, context):
+        def generate_arm(decl, indent):
+            if type(decl.typ) is XDRTypeVoid:
+                return []
+            return self.generate_size(
+                decl, "objp->%s_u.%s" % (obj.name, decl.identifier), indent
+            )
+
+        def generate_body(indent):
+            body = [
+                "%ssize_t size = %s;\n"
+                % (indent, self.size_str(self.decl_fixed_size(obj.body.discriminator))),
+                "\n",
+                "%sswitch (objp->%s) {\n" % (indent, obj.body.discriminator.identifier),
+            ]
+            for case in obj.body.cases:
+                body.append("%scase %s:\n" % (indent, case.value))
+                body.extend(generate_arm(case.decl, indent + "    "))
+                body.append("%s    break;\n" % indent)
+            body.append("%sdefault:\n" % indent)
+            if obj.body.default is not None:
+                body.extend(generate_arm(obj.body.default, indent + "    "))
+            body.append("%s    break;\n" % indent)
+            body.append("%s}\n" % indent)
+            return body
+
+        return self.generate_function(obj.name, obj, indent, generate_body)
+
+    def visit_definition_typedef(self, obj, indent, context):
+        name = obj.decl.identifier
+
+        def generate_body(indent):
+            value = "*objp"
+            if type(obj.decl) is XDRDeclarationFixedArray:
+                value = "objp"
+            return ["%ssize_t size = 0;\n" % indent, "\n"] + self.generate_size(
+                obj.decl, value, indent
+            )
+
+        return self.generate_function(name, obj, indent, generate_body)
+
+
+class XDRPythonCodecGenerator(XDRVisitor):
+    # struct module format character for each basic type,
+    # with the small integer types using a full XDR unit
+    # like their C encoding. Booleans are encoded as an
+    # unsigned int, but are flagged with '?' so they can
+    # be converted to and from True/False
+    BASIC_TYPE_FORMATS = {
+        XDRTypeChar: "i",
+        XDRTypeUnsignedChar: "I",
+        XDRTypeShort: "i",
+        XDRTypeUnsignedShort: "I",
+        XDRTypeInt: "i",
+        XDRTypeUnsignedInt: "I",
+        XDRTypeHyper: "q",
+        XDRTypeUnsignedHyper: "Q",
+        XDRTypeFloat: "f",
+        XDRTypeDouble: "d",
+        XDRTypeBool: "?",
+        XDRTypeEnum: "i",
+    }
+
+    FORMAT_SIZES = {"i": 4, "I": 4, "q": 8, "Q": 8, "f": 4, "d": 8, "?": 4}
+
+    # The precompiled struct.Struct in the module prologue
+    # for a single value of each format
+    FORMAT_STRUCTS = {
+        "i": "_int",
+        "I": "_uint",
+        "q": "_hyper",
+        "Q": "_uhyper",
+        "f": "_float",
+        "d": "_double",
+        "?": "_uint",
+    }
+
+    PROLOGUE = """import struct
+
+_int = struct.Struct(">i")
+_uint = struct.Struct(">I")
+_hyper = struct.Struct(">q")
+_uhyper = struct.Struct(">Q")
+_float = struct.Struct(">f")
+_double = struct.Struct(">d")
+
+_UNBOUNDED = 0xFFFFFFFF
+
+
+def pack(packer, value):
+    buf = bytearray()
+    packer(buf, value)
+    return bytes(buf)
+
+
+# Opaque data in the returned value is a memoryview
+# slice of 'data', so it is not copied. Each function
+# checks the length of 'data' before reading a value,
+# so truncated data is reported with its offset
+def unpack(unpacker, data):
+    value, offset = unpacker(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError("Trailing data after XDR value at offset %d" % offset)
+    return value
+
+
+def _pack_bool(buf, value):
+    buf += _uint.pack(1 if value else 0)
+
+
+def _unpack_bool(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (value,) = _uint.unpack_from(data, offset)
+    return value != 0, offset + 4
+
+
+def _pack_fixed_opaque(buf, value, length):
+    if len(value) != length:
+        raise ValueError("Opaque data length %d is not %d" % (len(value), length))
+    buf += value
+    buf += bytes(-length % 4)
+
+
+def _unpack_fixed_opaque(data, offset, length):
+    end = offset + length
+    if end + (-length % 4) > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    return data[offset:end], end + (-length % 4)
+
+
+def _pack_opaque(buf, value, maxlength):
+    if len(value) > maxlength:
+        raise ValueError("Opaque data length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    _pack_fixed_opaque(buf, value, len(value))
+
+
+def _unpack_opaque(data, offset, maxlength):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Opaque data length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_opaque(data, offset + 4, length)
+
+
+def _pack_string(buf, value, maxlength):
+    _pack_opaque(buf, value.encode("utf-8"), maxlength)
+
+
+def _unpack_string(data, offset, maxlength):
+    value, offset = _unpack_opaque(data, offset, maxlength)
+    return str(value, "utf-8"), offset
+
+
+def _pack_fixed_array(buf, value, length, packer):
+    if len(value) != length:
+        raise ValueError("Array length %d is not %d" % (len(value), length))
+    for element in value:
+        packer(buf, element)
+
+
+def _unpack_fixed_array(data, offset, length, unpacker):
+    value = []
+    for _ in range(length):
+        element, offset = unpacker(data, offset)
+        value.append(element)
+    return value, offset
+
+
+def _pack_fixed_scalar_array(buf, value, length, fmt):
+    buf += struct.pack(">%d%s" % (length, fmt), *value)
+
+
+def _unpack_fixed_scalar_array(data, offset, length, fmt):
+    fmt = struct.Struct(">%d%s" % (length, fmt))
+    if offset + fmt.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    return list(fmt.unpack_from(data, offset)), offset + fmt.size
+
+
+def _pack_scalar_array(buf, value, maxlength, fmt):
+    if len(value) > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    buf += struct.pack(">%d%s" % (len(value), fmt), *value)
+
+
+def _unpack_scalar_array(data, offset, maxlength, fmt):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_scalar_array(data, offset + 4, length, fmt)
+
+
+def _pack_array(buf, value, maxlength, packer):
+    if len(value) > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    _pack_fixed_array(buf, value, len(value), packer)
+
+
+def _unpack_array(data, offset, maxlength, unpacker):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_array(data, offset + 4, length, unpacker)
+"""
+
+    # 'defines' is a list of (name, value) pairs for constants
+    # which the spec uses, but which are defined by C headers
+    def __init__(self, spec, defines=[]):
+        super().__init__(spec)
+        self.defines = defines
+        self.structs = set()
+        self.newstructs = []
+        self.constants = set()
+        # The names of constants used by the generated code
+        self.references = set()
+
+    def emit_specification(self, obj, sink, indent, context):
+        defines = []
+        for name, value in self.defines:
+            self.constants.add(name)
+            defines.append("%s = %s\n" % (name, self.literal(value)))
+        code = []
+        for definition in obj.definitions:
+            defcode = self.visit_object(definition, indent, context)
+            if defcode is not None:
+                code.append((definition, defcode))
+
+        # Constants defined by C headers are only known from
+        # 'defines', without which the module would fail to
+        # import with a NameError. The definitions are all
+        # generated before writing anything, so no partial
+        # module is left behind
+        missing = self.references - self.constants
+        if len(missing) > 0:
+            raise Exception(
+                "Missing values for constants not defined by the spec: %s"
+                % ", ".join(sorted(missing))
+            )
+
+        sink.write(self.PROLOGUE)
+        if len(defines) > 0:
+            sink.write("\n\n")
+        sink.writelines(defines)
+        previous = None
+        for definition, defcode in code:
+            # Keep runs of constants together
+            if not (
+                type(definition) is XDRDefinitionConstant
+                and type(previous) is XDRDefinitionConstant
+            ):
+                sink.write("\n\n")
+            sink.write(defcode)
+            previous = definition
+
+    def literal(self, value):
+        if len(value) > 1 and value[0] == "0" and value[1].isdecimal():
+            return "0o" + value[1:]
+        if value.isidentifier():
+            self.references.add(value)
+        return value
+
+    def maxlength(self, decl):
+        if decl.maxlength is None:
+            return "_UNBOUNDED"
+        return self.literal(decl.maxlength)
+
+    def scalar_format(self, typ):
+        if type(typ) in self.BASIC_TYPE_FORMATS:
+            return self.BASIC_TYPE_FORMATS[type(typ)]
+        if type(typ) is XDRTypeCustom:
+            if type(typ.definition) is XDRDefinitionEnum:
+                return "i"
+            if (
+                type(typ.definition) is XDRDefinitionTypedef
+                and type(typ.definition.decl) is XDRDeclarationScalar
+            ):
+                return self.scalar_format(typ.definition.decl.typ)
+        return None
+
+    # Returns the name of a precompiled struct.Struct for
+    # 'fmt', repeated 'count' times, declaring it before the
+    # current definition if not already done. Returns None
+    # if 'count' is a constant not defined by the spec, which
+    # may be provided later from a C header
+    def struct_name(self, fmt, count=None):
+        fmt = fmt.replace("?", "I")
+        if count in self.spec.constants:
+            count = str(self.spec.constants[count])
+        if count is None:
+            name = "_fmt_%s" % fmt
+            code = '%s = struct.Struct(">%s")\n' % (name, fmt)
+        elif count.isdecimal():
+            name = "_fmt_%d%s" % (int(count), fmt)
+            code = '%s = struct.Struct(">%d%s")\n' % (name, int(count), fmt)
+        elif count in self.constants:
+            name = "_fmt_%s_%s" % (count, fmt)
+            code = '%s = struct.Struct(">%%d%s" %% %s)\n' % (
+                name,
+                fmt,
+                self.literal(count),
+            )
+        else:
+            return None
+        if name not in self.structs:
+            self.structs.add(name)
+            self.newstructs.append(code)
+        return name
+
+    def element_functions(self, typ):
+        if self.scalar_format(typ) == "?":
+            return ("_pack_bool", "_unpack_bool")
+        if type(typ) is not XDRTypeCustom:
+            raise Exception("Cannot generate Python codec for anonymous type %s" % typ)
+        return ("pack_%s" % typ.identifier, "unpack_%s" % typ.identifier)
+
+    def generate_pack_scalar(self, typ, value, indent):
+        fmt = self.scalar_format(typ)
+        if fmt == "?":
+            return ["%sbuf += _uint.pack(1 if %s else 0)\n" % (indent, value)]
+        if fmt is not None:
+            return [
+                "%sbuf += %s.pack(%s)\n" % (indent, self.FORMAT_STRUCTS[fmt], value)
+            ]
+        return ["%s%s(buf, %s)\n" % (indent, self.element_functions(typ)[0], value)]
+
+    # Returns the code checking that 'data' holds the
+    # 'size' bytes about to be read at the current offset
+    def generate_unpack_check(self, size, indent):
+        return [
+            "%sif offset + %s > len(data):\n" % (indent, size),
+            '%s    raise ValueError("Truncated XDR data at offset %%d" %% offset)\n'
+            % indent,
+        ]
+
+    def generate_unpack_scalar(self, typ, value, indent):
+        fmt = self.scalar_format(typ)
+        if fmt == "?":
+            return self.generate_unpack_check(4, indent) + [
+                "%s%s = _uint.unpack_from(data, offset)[0] != 0\n" % (indent, value),
+                "%soffset += 4\n" % indent,
+            ]
+        if fmt is not None:
+            return self.generate_unpack_check(self.FORMAT_SIZES[fmt], indent) + [
+                "%s(%s,) = %s.unpack_from(data, offset)\n"
+                % (indent, value, self.FORMAT_STRUCTS[fmt]),
+                "%soffset += %d\n" % (indent, self.FORMAT_SIZES[fmt]),
+            ]
+        return [
+            "%s%s, offset = %s(data, offset)\n"
+            % (indent, value, self.element_functions(typ)[1])
+        ]
+
+    def generate_pack(self, decl, value, indent):
+        if type(decl.typ) is XDRTypeVoid:
+            return []
+
+        if type(decl) is XDRDeclarationScalar:
+            return self.generate_pack_scalar(decl.typ, value, indent)
+
+        if type(decl) is XDRDeclarationPointer:
+            return [
+                "%sif %s is None:\n" % (indent, value),
+                "%s    buf += _uint.pack(0)\n" % indent,
+                "%selse:\n" % indent,
+                "%s    buf += _uint.pack(1)\n" % indent,
+            ] + self.generate_pack_scalar(decl.typ, value, indent + "    ")
+
+        fmt = self.scalar_format(decl.typ)
+        if type(decl) is XDRDeclarationFixedArray:
+            if type(decl.typ) is XDRTypeOpaque:
+                return [
+                    "%s_pack_fixed_opaque(buf, %s, %s)\n"
+                    % (indent, value, self.literal(decl.length))
+                ]
+            if fmt is not None and fmt != "?":
+                name = self.struct_name(fmt, decl.length)
+                if name is None:
+                    return [
+                        '%s_pack_fixed_scalar_array(buf, %s, %s, "%s")\n'
+                        % (indent, value, self.literal(decl.length), fmt)
+                    ]
+                return ["%sbuf += %s.pack(*%s)\n" % (indent, name, value)]
+            return [
+                "%s_pack_fixed_array(buf, %s, %s, %s)\n"
+                % (
+                    indent,
+                    value,
+                    self.literal(decl.length),
+                    self.element_functions(decl.typ)[0],
+                )
+            ]
+
+        if type(decl.typ) is XDRTypeString:
+            return [
+                "%s_pack_string(buf, %s, %s)\n" % (indent, value, self.maxlength(decl))
+            ]
+        if type(decl.typ) is XDRTypeOpaque:
+            return [
+                "%s_pack_opaque(buf, %s, %s)\n" % (indent, value, self.maxlength(decl))
+            ]
+        if fmt is not None and fmt != "?":
+            return [
+                '%s_pack_scalar_array(buf, %s, %s, "%s")\n'
+                % (indent, value, self.maxlength(decl), fmt)
+            ]
+        return [
+            "%s_pack_array(buf, %s, %s, %s)\n"
+            % (
+                indent,
+                value,
+                self.maxlength(decl),
+                self.element_functions(decl.typ)[0],
+            )
+        ]
+
+    def generate_unpack(self, decl, value, indent):
+        if type(decl.typ) is XDRTypeVoid:
+            return []
+
+        if type(decl) is XDRDeclarationScalar:
+            return self.generate_unpack_scalar(decl.typ, value, indent)
+
+        if type(decl) is XDRDeclarationPointer:
+            return (
+                self.generate_unpack_check(4, indent)
+                + [
+                    "%soffset += 4\n" % indent,
+                    "%sif _uint.unpack_from(data, offset - 4)[0] == 0:\n" % indent,
+                    "%s    %s = None\n" % (indent, value),
+                    "%selse:\n" % indent,
+                ]
+                + self.generate_unpack_scalar(decl.typ, value, indent + "    ")
+            )
+
+        fmt = self.scalar_format(decl.typ)
+        if type(decl) is XDRDeclarationFixedArray:
+            if type(decl.typ) is XDRTypeOpaque:
+                return [
+                    "%s%s, offset = _unpack_fixed_opaque(data, offset, %s)\n"
+                    % (indent, value, self.literal(decl.length))
+                ]
+            if fmt is not None and fmt != "?":
+                name = self.struct_name(fmt, decl.length)
+                if name is None:
+                    return [
+                        "%s%s, offset = " % (indent, value)
+                        + '_unpack_fixed_scalar_array(data, offset, %s, "%s")\n'
+                        % (self.literal(decl.length), fmt)
+                    ]
+                return self.generate_unpack_check(name + ".size", indent) + [
+                    "%s%s = list(%s.unpack_from(data, offset))\n"
+                    % (indent, value, name),
+                    "%soffset += %s.size\n" % (indent, name),
+                ]
+            return [
+                "%s%s, offset = _unpack_fixed_array(data, offset, %s, %s)\n"
+                % (
+                    indent,
+                    value,
+                    self.literal(decl.length),
+                    self.element_functions(decl.typ)[1],
+                )
+            ]
+
+        if type(decl.typ) is XDRTypeString:
+            return [
+                "%s%s, offset = _unpack_string(data, offset, %s)\n"
+                % (indent, value, self.maxlength(decl))
+            ]
+        if type(decl.typ) is XDRTypeOpaque:
+            return [
+                "%s%s, offset = _unpack_opaque(data, offset, %s)\n"
+                % (indent, value, self.maxlength(decl))
+            ]
+        if fmt is not None and fmt != "?":
+            return [
+                '%s%s, offset = _unpack_scalar_array(data, offset, %s, "%s")\n'
+                % (indent, value, self.maxlength(decl), fmt)
+            ]
+        return [
+            "%s%s, offset = _unpack_array(data, offset, %s, %s)\n"
+            % (
+                indent,
+                value,
+                self.maxlength(decl),
+                self.element_functions(decl.typ)[1],
+            )
+        ]
+
+    def generate_functions(self, name, pack, unpack):
+        code = self.newstructs
+        if len(code) > 0:
+            code.append("\n\n")
+        self.newstructs = []
+        code.append("def pack_%s(buf, value):\n" % name)
+        code.extend(pack)
+        code.extend(["\n", "\n", "def unpack_%s(data, offset):\n" % name])
+        code.extend(unpack)
+        return "".join(code)
+
+    def visit_definition_constant(self, obj, indent, context):
+        self.constants.add(obj.name)
+        return "%s = %s\n" % (obj.name, self.literal(obj.value))
+
+    def visit_definition_enum(self, obj, indent, context):
+        code = []
+        for value in obj.body.values:
+            self.constants.add(value.name)
+            code.append("%s = %s\n" % (value.name, self.literal(value.value)))
+        code.append("\n\n")
+        code.append(
+            self.generate_functions(
+                obj.name,
+                ["    buf += _int.pack(value)\n"],
+                self.generate_unpack_check(4, "    ")
+                + [
+                    "    (value,) = _int.unpack_from(data, offset)\n",
+                    "    return value, offset + 4\n",
+                ],
+            )
+        )
+        return "".join(code)
+
+    def visit_definition_struct(self, obj, indent, context):
+        pack = []
+        unpack = ["    obj = {}\n"]
+
+        # Consecutive scalar fields are packed and unpacked
+        # together with a single precompiled struct.Struct
+        fields = obj.body.fields
+        i = 0
+        while i < len(fields):
+            run = []
+            while (
+                i + len(run) < len(fields)
+                and type(fields[i + len(run)]) is XDRDeclarationScalar
+                and self.scalar_format(fields[i + len(run)].typ) is not None
+            ):
+                run.append(fields[i + len(run)])
+
+            if len(run) < 2:
+                field = fields[i]
+                value = '["%s"]' % field.identifier
+                pack.extend(self.generate_pack(field, "value" + value, "    "))
+                unpack.extend(self.generate_unpack(field, "obj" + value, "    "))
+                i = i + 1
+                continue
+
+            formats = [self.scalar_format(field.typ) for field in run]
+            name = self.struct_name("".join(formats))
+            values = []
+            for field, fmt in zip(run, formats):
+                if fmt == "?":
+                    values.append('1 if value["%s"] else 0' % field.identifier)
+                else:
+                    values.append('value["%s"]' % field.identifier)
+            pack.append("    buf += %s.pack(\n" % name)
+            for value in values:
+                pack.append("        %s,\n" % value)
+            pack.append("    )\n")
+
+            size = sum([self.FORMAT_SIZES[fmt] for fmt in formats])
+            unpack.extend(self.generate_unpack_check(size, "    "))
+            unpack.append("    (\n")
+            for field in run:
+                unpack.append('        obj["%s"],\n' % field.identifier)
+            unpack.append("    ) = %s.unpack_from(data, offset)\n" % name)
+            unpack.append("    offset += %d\n" % size)
+            for field, fmt in zip(run, formats):
+                if fmt == "?":
+                    unpack.append(
+                        '    obj["%s"] = obj["%s"] != 0\n'
+                        % (field.identifier, field.identifier)
+                    )
+            i = i + len(run)
+
+        unpack.append("    return obj, offset\n")
+        return self.generate_functions(obj.name, pack, unpack)
+
+    def generate_union_arms(self, obj, generate, value, indent):
+        code = []
+        discriminator = '%s["%s"]' % (value, obj.body.discriminator.identifier)
+        keyword = "if"
+        for case in obj.body.cases:
+            code.append(
+                "%s%s %s == %s:\n"
+                % (indent, keyword, discriminator, self.literal(case.value))
+            )
+            body = generate(
+                case.decl, '%s["%s"]' % (value, case.decl.identifier), indent + "    "
+            )
+            if len(body) == 0:
+                body = ["%s    pass\n" % indent]
+            code.extend(body)
+            keyword = "elif"
+
+        if obj.body.default is not None:
+            body = generate(
+                obj.body.default,
+                '%s["%s"]' % (value, obj.body.default.identifier),
+                indent + "    ",
+            )
+        else:
+            body = [
+                '%s    raise ValueError("Invalid %s discriminator %%r" %% %s)\n'
+                % (indent, obj.name, discriminator)
+            ]
+        if len(code) == 0:
+            return [line[4:] for line in body]
+        if len(body) > 0:
+            code.append("%selse:\n" % indent)
+            code.extend(body)
+        return code
+
+    def visit_definition_union(self, obj, indent, context):
+        discriminator = '["%s"]' % obj.body.discriminator.identifier
+        pack = self.generate_pack(
+            obj.body.discriminator, "value" + discriminator, "    "
+        ) + self.generate_union_arms(obj, self.generate_pack, "value", "    ")
+        unpack = (
+            ["    obj = {}\n"]
+            + self.generate_unpack(
+                obj.body.discriminator, "obj" + discriminator, "    "
+            )
+            + self.generate_union_arms(obj, self.generate_unpack, "obj", "    ")
+            + ["    return obj, offset\n"]
+        )
+        return self.generate_functions(obj.name, pack, unpack)
+
+    def visit_definition_typedef(self, obj, indent, context):
+        pack = self.generate_pack(obj.decl, "value", "    ")
+        unpack = self.generate_unpack(obj.decl, "value", "    ") + [
+            "    return value, offset\n"
+        ]
+        return self.generate_functions(obj.decl.identifier, pack, unpack)
+
+
+class XDRBenchmarkGenerator(XDRVisitor):
+    PROLOGUE = """#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#define BENCH_UNUSED __attribute__((unused))
+
+/* Nesting depth at which optional data and arrays are left empty,
+ * which also stops recursion through self-referential types */
+#define BENCH_MAX_DEPTH 4
+
+/* Number of elements filled in for variable length data */
+#define BENCH_ARRAY_LEN 4
+#define BENCH_OPAQUE_LEN 64
+
+#define BENCH_LEN(max, len, depth) \\
+    ((depth) >= BENCH_MAX_DEPTH ? 0 : (max) < (len) ? (max) : (len))
+
+static char bench_buf[1024 * 1024];
+static int bench_first = 1;
+
+static BENCH_UNUSED void *
+bench_alloc(size_t size)
+{
+    void *ret = calloc(1, size ? size : 1);
+
+    if (!ret)
+        abort();
+    return ret;
+}
+
+static BENCH_UNUSED char *
+bench_string(size_t len)
+{
+    char *ret = bench_alloc(len + 1);
+
+    memset(ret, 'x', len);
+    return ret;
+}
+
+static double
+bench_elapsed(struct timespec *start, struct timespec *end)
+{
+    return (end->tv_sec - start->tv_sec) * 1e9 +
+        (end->tv_nsec - start->tv_nsec);
+}
+
+static BENCH_UNUSED void
+bench_run(const char *name, xdrproc_t proc, void *objp,
+          void *decoded, size_t size, size_t iterations)
+{
+    XDR xdr;
+    struct timespec start;
+    struct timespec end;
+    double encode_ns;
+    double decode_ns;
+    u_int len;
+    size_t i;
+
+    xdrmem_create(&xdr, bench_buf, sizeof(bench_buf), XDR_ENCODE);
+    if (!proc(&xdr, objp, 0)) {
+        fprintf(stderr, "Unable to encode %s, skipping\\n", name);
+        xdr_destroy(&xdr);
+        return;
+    }
+    len = xdr_getpos(&xdr);
+    xdr_destroy(&xdr);
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (i = 0; i < iterations; i++) {
+        xdrmem_create(&xdr, bench_buf, sizeof(bench_buf), XDR_ENCODE);
+        if (!proc(&xdr, objp, 0))
+            abort();
+        xdr_destroy(&xdr);
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    encode_ns = bench_elapsed(&start, &end) / iterations;
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (i = 0; i < iterations; i++) {
+        memset(decoded, 0, size);
+        xdrmem_create(&xdr, bench_buf, len, XDR_DECODE);
+        if (!proc(&xdr, decoded, 0))
+            abort();
+        xdr_destroy(&xdr);
+        xdr_free(proc, decoded);
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    decode_ns = bench_elapsed(&start, &end) / iterations;
+
+    printf("%s\\n  {\\"type\\": \\"%s\\", \\"bytes_per_op\\": %u, "
+           "\\"encode_ns_per_op\\": %.1f, \\"decode_ns_per_op\\": %.1f}",
+           bench_first ? "" : ",", name, len, encode_ns, decode_ns);
+    bench_first = 0;
+}
+"""
+
+    # Representative values assigned to scalar fields
+    SCALAR_VALUES = {
+        XDRTypeChar: "'x'",
+        XDRTypeUnsignedChar: "'y'",
+        XDRTypeShort: "-7",
+        XDRTypeUnsignedShort: "14",
+        XDRTypeInt: "-1729",
+        XDRTypeUnsignedInt: "1729",
+        XDRTypeHyper: "-87539319",
+        XDRTypeUnsignedHyper: "87539319",
+        XDRTypeFloat: "0.1729",
+        XDRTypeDouble: "8753.9319",
+        XDRTypeBool: "TRUE",
+    }
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.unfillable = set()
+        # The structs which are not benchmarked as they use
+        # types which are not defined by the spec
+        self.skipped = []
+
+    def decl_fillable(self, decl):
+        typ = decl.typ
+        if type(typ) in self.SCALAR_VALUES or type(typ) in [
+            XDRTypeVoid,
+            XDRTypeOpaque,
+            XDRTypeString,
+        ]:
+            return True
+        if type(typ) is not XDRTypeCustom or typ.definition is None:
+            return False
+        if type(typ.definition) is XDRDefinitionEnum:
+            return True
+        return self.definition_name(typ.definition) not in self.unfillable
+
+    def definition_decls(self, definition):
+        if type(definition) is XDRDefinitionStruct:
+            return definition.body.fields
+        if type(definition) is XDRDefinitionUnion:
+            decls = [case.decl for case in definition.body.cases]
+            if definition.body.default is not None:
+                decls.append(definition.body.default)
+            return decls
+        if type(definition) is XDRDefinitionTypedef:
+            return [definition.decl]
+        return []
+
+    # Finds the definitions which cannot be filled in as they
+    # use, directly or through other definitions, types which
+    # are defined by another spec, such as the remote protocol
+    # types used by the qemu and lxc protocols
+    def find_unfillable(self):
+        changed = True
+        while changed:
+            changed = False
+            for definition in self.spec.definitions:
+                name = self.definition_name(definition)
+                if name is None or name in self.unfillable:
+                    continue
+                if not all(
+                    [self.decl_fillable(d) for d in self.definition_decls(definition)]
+                ):
+                    self.unfillable.add(name)
+                    changed = True
+
+        for definition in self.spec.definitions:
+            if (
+                type(definition) is XDRDefinitionStruct
+                and definition.name in self.unfillable
+            ):
+                self.skipped.append(definition.name)
+
+    def emit_specification(self, obj, sink, indent, context):
+        self.find_unfillable()
+        sink.write(self.PROLOGUE)
+
+        # Declare all fill functions up front, since types
+        # may refer to each other through pointers
+        sink.write("\n")
+        for definition in obj.definitions:
+            name = self.definition_name(definition)
+            if name is not None and name not in self.unfillable:
+                sink.write(
+                    "static void bench_fill_%s(%s, int depth) BENCH_UNUSED;\n"
+                    % (name, self.fill_param(definition))
+                )
+
+        for definition in obj.definitions:
+            if self.definition_name(definition) in self.unfillable:
+                continue
+            defcode = self.visit_object(definition, indent, context)
+            if defcode is not None:
+                sink.write("\n")
+                sink.write(defcode)
+
+        code = [
+            "\n",
+            "int\n",
+            "main(int argc, char **argv)\n",
+            "{\n",
+            "    size_t iterations = 10000;\n",
+            "\n",
+            "    if (argc > 1)\n",
+            "        iterations = strtoul(argv[1], NULL, 10);\n",
+            "    if (iterations == 0) {\n",
+            '        fprintf(stderr, "Usage: %s [ITERATIONS]\\n", argv[0]);\n',
+            "        return EXIT_FAILURE;\n",
+            "    }\n",
+            "\n",
+            '    printf("[");\n',
+        ]
+        for definition in obj.definitions:
+            if (
+                type(definition) is XDRDefinitionStruct
+                and definition.name not in self.unfillable
+            ):
+                code.append("    bench_%s(iterations);\n" % definition.name)
+        code.extend(
+            [
+                '    printf("\\n]\\n");\n',
+                "    return EXIT_SUCCESS;\n",
+                "}\n",
+            ]
+        )
+        sink.write("".join(code))
+
+    @staticmethod
+    def definition_name(definition):
+        if type(definition) in [XDRDefinitionStruct, XDRDefinitionUnion]:
+            return definition.name
+        if type(definition) is XDRDefinitionTypedef:
+            return definition.decl.identifier
+        return None
+
+    def fill_param(self, definition):
+        if type(definition) is XDRDefinitionTypedef and (
+            type(definition.decl) is XDRDeclarationFixedArray
+        ):
+            return "%s objp" % definition.decl.identifier
+        return "%s *objp" % self.definition_name(definition)
+
+    # 'value' is a C lvalue for the object being filled,
+    # from which these derive its address and members
+    @staticmethod
+    def value_address(value):
+        if value.startswith("*"):
+            return value[1:]
+        return "&" + value
+
+    @staticmethod
+    def value_member(value, member):
+        if value == "*objp":
+            return "objp->" + member
+        return value + "." + member
+
+    def generate_fill_scalar(self, typ, value, indent):
+        if type(typ) in self.SCALAR_VALUES:
+            return ["%s%s = %s;\n" % (indent, value, self.SCALAR_VALUES[type(typ)])]
+        if type(typ) is not XDRTypeCustom or typ.definition is None:
+            raise Exception("Cannot fill value of type %s" % typ)
+        if type(typ.definition) is XDRDefinitionEnum:
+            return [
+                "%s%s = %s;\n" % (indent, value, typ.definition.body.values[0].name)
+            ]
+        if (
+            type(typ.definition) is XDRDefinitionTypedef
+            and type(typ.definition.decl) is XDRDeclarationFixedArray
+        ):
+            return [
+                "%sbench_fill_%s(%s, depth + 1);\n" % (indent, typ.identifier, value)
+            ]
+        return [
+            "%sbench_fill_%s(%s, depth + 1);\n"
+            % (indent, typ.identifier, self.value_address(value))
+        ]
+
+    def generate_fill(self, decl, value, indent):
+        if type(decl.typ) is XDRTypeVoid:
+            return []
+
+        if type(decl) is XDRDeclarationScalar:
+            return self.generate_fill_scalar(decl.typ, value, indent)
+
+        if type(decl) is XDRDeclarationPointer:
+            return (
+                [
+                    "%sif (depth < BENCH_MAX_DEPTH) {\n" % indent,
+                    "%s    %s = bench_alloc(sizeof(*%s));\n" % (indent, value, value),
+                ]
+                + self.generate_fill_scalar(decl.typ, "*" + value, indent + "    ")
+                + ["%s}\n" % indent]
+            )
+
+        if type(decl) is XDRDeclarationFixedArray:
+            if type(decl.typ) is XDRTypeOpaque:
+                return [
+                    "%smemset(%s, 'x', %s);\n" % (indent, value, decl.length),
+                ]
+            return (
+                [
+                    "%sfor (i = 0; i < %s; i++) {\n" % (indent, decl.length),
+                ]
+                + self.generate_fill_scalar(decl.typ, value + "[i]", indent + "    ")
+                + ["%s}\n" % indent]
+            )
+
+        maxlength = decl.maxlength
+        if maxlength is None:
+            maxlength = "~0u"
+        if type(decl.typ) is XDRTypeString:
+            return [
+                "%s%s = bench_string(BENCH_LEN(%s, BENCH_OPAQUE_LEN, depth));\n"
+                % (indent, value, maxlength)
+            ]
+
+        length = self.value_member(value, decl.identifier + "_len")
+        elements = self.value_member(value, decl.identifier + "_val")
+        code = [
+            "%s%s = BENCH_LEN(%s, %s, depth);\n"
+            % (
+                indent,
+                length,
+                maxlength,
+                (
+                    "BENCH_OPAQUE_LEN"
+                    if type(decl.typ) is XDRTypeOpaque
+                    else "BENCH_ARRAY_LEN"
+                ),
+            ),
+            "%s%s = bench_alloc(%s * sizeof(*%s));\n"
+            % (indent, elements, length, elements),
+        ]
+        if type(decl.typ) is XDRTypeOpaque:
+            code.append("%smemset(%s, 'x', %s);\n" % (indent, elements, length))
+            return code
+        return (
+            code
+            + ["%sfor (i = 0; i < %s; i++) {\n" % (indent, length)]
+            + self.generate_fill_scalar(decl.typ, elements + "[i]", indent + "    ")
+            + ["%s}\n" % indent]
+        )
+
+    def generate_fill_function(self, definition, body):
+        code = [
+            "static void\n",
+            "bench_fill_%s(%s, int depth BENCH_UNUSED)\n"
+            % (self.definition_name(definition), self.fill_param(definition)),
+            "{\n",
+        ]
+        if any(["[i]" in line for line in body]):
+            code.extend(["    size_t i;\n", "\n"])
+        code.extend(body)
+        code.append("}\n")
+        return "".join(code)
+
+    def visit_definition_struct(self, obj, indent, context):
+        body = []
+        for field in obj.body.fields:
+            body.extend(
+                self.generate_fill(field, "objp->%s" % field.identifier, "    ")
+            )
+        code = self.generate_fill_function(obj, body)
+
+        code = code + (
+            "\n"
+            + "static void\n"
+            + "bench_%s(size_t iterations)\n" % obj.name
+            + "{\n"
+            + "    %s value;\n" % obj.name
+            + "    %s decoded;\n" % obj.name
+            + "\n"
+            + "    memset(&value, 0, sizeof(value));\n"
+            + "    bench_fill_%s(&value, 0);\n" % obj.name
+            + '    bench_run("%s", (xdrproc_t)xdr_%s, &value,\n' % (obj.name, obj.name)
+            + "              &decoded, sizeof(decoded), iterations);\n"
+            + "    xdr_free((xdrproc_t)xdr_%s, (char *)&value);\n" % obj.name
+            + "}\n"
+        )
+        return code
+
+    def visit_definition_union(self, obj, indent, context):
+        discriminator = "objp->%s" % obj.body.discriminator.identifier
+        if len(obj.body.cases) > 0:
+            case = obj.body.cases[0]
+            body = ["    %s = %s;\n" % (discriminator, case.value)]
+            arm = case.decl
+        else:
+            body = []
+            arm = obj.body.default
+        body.extend(
+            self.generate_fill(
+                arm, "objp->%s_u.%s" % (obj.name, arm.identifier), "    "
+            )
+        )
+        return self.generate_fill_function(obj, body)
+
+    def visit_definition_typedef(self, obj, indent, context):
+        value = "*objp"
+        if type(obj.decl) is XDRDeclarationFixedArray:
+            value = "objp"
+        return self.generate_fill_function(
+            obj, self.generate_fill(obj.decl, value, "    ")
+        )
@@ -1,6 +1,8 @@
 # SPDX-License-Identifier: LGPL-2.1-or-later
 
 import abc
+import re
+import sys
 
 
 class XDRReader:
@@ -111,6 +113,11 @@ class XDRTokenComment(XDRToken):
 
 
 class XDRTokenIdentifier(XDRToken):
+    def __init__(self, line, column, value):
+        # Names recur throughout the protocol, so share a
+        # single copy of each between the tokens and AST
+        super().__init__(line, column, sys.intern(value))
+
     @classmethod
     def start(cls, reader):
         c = reader.peek()
@@ -136,6 +143,9 @@ class XDRTokenPunctuation(XDRToken):
 
 
 class XDRTokenConstant(XDRToken):
+    def __init__(self, line, column, value):
+        super().__init__(line, column, sys.intern(value))
+
     @classmethod
     def start(cls, reader):
         c1 = reader.peek()
@@ -173,10 +183,37 @@ class XDRTokenSpace(XDRToken):
         return c is None or not c.isspace()
 
 
-class XDRLexer:
+class XDRBaseLexer(abc.ABC):
+    def __init__(self):
+        self.lookahead = []
+
+    @abc.abstractmethod
+    def _token(self):
+        pass
+
+    def next(self):
+        if len(self.lookahead) > 0:
+            token = self.lookahead[0]
+            self.lookahead = self.lookahead[1:]
+            return token
+        return self._token()
+
+    def peek(self):
+        if len(self.lookahead) == 0:
+            token = self._token()
+            if token is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[0]
+
+
+# The original character-at-a-time lexer, driven by the
+# start/end methods of each XDRToken subclass. Kept so
+# that the output of XDRLexer can be cross-checked
+class XDRLegacyLexer(XDRBaseLexer):
     def __init__(self, fp):
+        super().__init__()
         self.reader = XDRReader(fp)
-        self.lookahead = []
 
     def _token(self):
         tokenTypes = [
@@ -197,17 +234,62 @@ class XDRLexer:
                     if type(ret) not in [XDRTokenSpace, XDRTokenComment]:
                         return ret
 
-    def next(self):
-        if len(self.lookahead) > 0:
-            token = self.lookahead[0]
-            self.lookahead = self.lookahead[1:]
-            return token
-        return self._token()
 
-    def peek(self):
-        if len(self.lookahead) == 0:
-            token = self._token()
-            if token is None:
+# Reads the whole input upfront and scans it with a single
+# compiled regex, whose alternatives mirror the start/end
+# rules of the XDRToken subclasses used by XDRLegacyLexer
+class XDRLexer(XDRBaseLexer):
+    tokenRE = re.compile(
+        r"(?P<comment>/\*/|/\*(?s:.*?)\*/)"
+        + r"|(?P<unterminated>/\*)"
+        + r"|(?P<identifier>[^\W\d_]\w*)"
+        + r"|(?P<cescape>^%[^\n]*)"
+        + r"|(?P<punctuation>[;={},\[\]<>*():])"
+        + r"|(?P<constant>-?\d[\d.xXa-fA-F]*)"
+        + r"|(?P<space>\s+)",
+        re.MULTILINE,
+    )
+
+    tokenTypes = {
+        "identifier": XDRTokenIdentifier,
+        "cescape": XDRTokenCEscape,
+        "punctuation": XDRTokenPunctuation,
+        "constant": XDRTokenConstant,
+    }
+
+    def __init__(self, fp):
+        super().__init__()
+        self.text = fp.read()
+        self.pos = 0
+        self.line = 1
+        self.linestart = 0
+
+    def _token(self):
+        while True:
+            if self.pos >= len(self.text):
                 return None
-            self.lookahead.append(token)
-        return self.lookahead[0]
+
+            column = self.pos - self.linestart
+            match = self.tokenRE.match(self.text, self.pos)
+            if match is None:
+                raise Exception(
+                    "Unexpected character '%s' at %d:%d"
+                    % (self.text[self.pos], self.line, column)
+                )
+
+            kind = match.lastgroup
+            if kind == "unterminated":
+                raise Exception(
+                    "EOF before closing comment starting at %d:%d" % (self.line, column)
+                )
+
+            line = self.line
+            start, self.pos = match.span()
+            if kind in ["space", "comment"]:
+                newlines = self.text.count("\n", start, self.pos)
+                if newlines > 0:
+                    self.line = self.line + newlines
+                    self.linestart = self.text.rindex("\n", start, self.pos) + 1
+                continue
+
+            return self.tokenTypes[kind](line, column, match.group())
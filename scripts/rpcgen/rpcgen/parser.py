@@ -2,6 +2,7 @@
 
 from .lexer import (
     XDRLexer,
+    XDRLegacyLexer,
     XDRTokenPunctuation,
     XDRTokenIdentifier,
     XDRTokenCEscape,
@@ -144,12 +145,17 @@ from .ast import (
 #     instead of union body
 #
 class XDRParser:
-    def __init__(self, fp):
-        self.lexer = XDRLexer(fp)
+    def __init__(self, fp, legacy_lexer=False):
+        if legacy_lexer:
+            self.lexer = XDRLegacyLexer(fp)
+        else:
+            self.lexer = XDRLexer(fp)
         self.typedefs = {}
+        self.constants = {}
 
     def parse(self):
         spec = XDRSpecification()
+        spec.constants = self.constants
         while True:
             definition = self.parse_definition()
             if definition is None:
@@ -204,8 +210,33 @@ class XDRParser:
         if type(const) not in [XDRTokenConstant, XDRTokenIdentifier]:
             raise Exception("Expected constant, but got %s" % const)
 
+        self.define_constant(ident.value, const.value)
         return XDRDefinitionConstant(ident.value, const.value)
 
+    # Returns the integer value of a constant literal, or
+    # of a previously defined constant or enum value. A name
+    # which is not known evaluates to None, since it may be
+    # defined by a C header included by the generated code
+    def evaluate_constant(self, value):
+        if not (value[0].isdecimal() or value[0] == "-"):
+            return self.constants.get(value)
+
+        digits = value.lstrip("-")
+        sign = -1 if value[0] == "-" else 1
+        try:
+            if len(digits) > 1 and digits[0] == "0" and digits[1] not in "xX":
+                return sign * int(digits, 8)
+            return sign * int(digits, 0)
+        except ValueError:
+            raise Exception("Invalid constant '%s'" % value)
+
+    def define_constant(self, name, value):
+        if name in self.constants:
+            raise Exception("Constant '%s' already defined" % name)
+        value = self.evaluate_constant(value)
+        if value is not None:
+            self.constants[name] = value
+
     def parse_definition_typedef(self):
         decl = self.parse_declaration()
         if decl.identifier in self.typedefs:
@@ -390,6 +421,7 @@ class XDRParser:
             ]:
                 raise Exception("Expected '}' or ',', but got %s" % separator)
 
+            self.define_constant(ident.value, value.value)
             values.append(XDREnumValue(ident.value, value.value))
 
             if separator.value == "}":
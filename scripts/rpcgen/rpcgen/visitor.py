@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: LGPL-2.1-or-later
 
 import abc
+import io
 
 from .ast import (
     XDRSpecification,
@@ -16,45 +17,71 @@ from .ast import (
 
 
 class XDRVisitor(abc.ABC):
+    # Maps node classes to the visit_* function handling
+    # them. Each subclass gets its own table, filled in
+    # lazily as node classes are first encountered
+    dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = {}
+
     def __init__(self, spec):
         self.spec = spec
 
     def visit(self, indent="", context=""):
         return self.visit_object(self.spec, indent="", context=context)
 
-    def visit_object(self, obj, indent="", context=""):
+    # Like visit(), but writes the code for each definition
+    # to 'sink' as soon as it is generated, rather than
+    # returning the code for the whole specification
+    def emit(self, sink, context=""):
+        self.emit_specification(self.spec, sink, "", context)
+
+    @staticmethod
+    def funcname(obj):
         if isinstance(obj, XDRSpecification):
-            funcname = "visit_specification"
+            return "visit_specification"
         elif isinstance(obj, XDRDefinition):
-            funcname = "visit_definition_" + type(obj).__name__[13:].lower()
+            return "visit_definition_" + type(obj).__name__[13:].lower()
         elif isinstance(obj, XDRDeclaration):
-            funcname = "visit_declaration_" + type(obj).__name__[14:].lower()
+            return "visit_declaration_" + type(obj).__name__[14:].lower()
         elif isinstance(obj, XDRType):
-            funcname = "visit_type_" + type(obj).__name__[7:].lower()
+            return "visit_type_" + type(obj).__name__[7:].lower()
         elif isinstance(obj, XDREnumValue):
-            funcname = "visit_enum_value"
+            return "visit_enum_value"
         elif isinstance(obj, XDREnumBody):
-            funcname = "visit_enum_body"
+            return "visit_enum_body"
         elif isinstance(obj, XDRStructBody):
-            funcname = "visit_struct_body"
+            return "visit_struct_body"
         elif isinstance(obj, XDRUnionCase):
-            funcname = "visit_union_case"
+            return "visit_union_case"
         elif isinstance(obj, XDRUnionBody):
-            funcname = "visit_union_body"
+            return "visit_union_body"
         else:
             raise Exception("Unhandled %s" % obj.__class__.__name__)
 
-        func = getattr(self, funcname)
-        assert func is not None
-        return func(obj, indent, context)
+    def visit_object(self, obj, indent="", context=""):
+        func = self.dispatch.get(type(obj))
+        if func is None:
+            func = getattr(type(self), self.funcname(obj))
+            assert func is not None
+            self.dispatch[type(obj)] = func
+        return func(self, obj, indent, context)
 
     def visit_specification(self, obj, indent, context):
-        code = []
-        for definition in self.spec.definitions:
+        sink = io.StringIO()
+        self.emit_specification(obj, sink, indent, context)
+        return sink.getvalue()
+
+    def emit_specification(self, obj, sink, indent, context):
+        separator = ""
+        for definition in obj.definitions:
             defcode = self.visit_object(definition, indent, context)
             if defcode is not None:
-                code.append(defcode)
-        return "\n".join(code)
+                sink.write(separator)
+                sink.write(defcode)
+                separator = "\n"
 
     def visit_definition_cescape(self, obj, indent, context):
         pass
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: LGPL-2.1-or-later
+#
+# Micro-benchmark of the XDRVisitor dispatch, running all
+# four C code generators over the remote protocol
+#
+#   $ python3 scripts/rpcgen/tests/bench_visitor.py [-n COUNT] [PROTOCOL.x]
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rpcgen.parser import XDRParser  # noqa: E402
+from rpcgen.generator import (  # noqa: E402
+    XDRTypeDeclarationGenerator,
+    XDRTypeImplementationGenerator,
+    XDRMarshallDeclarationGenerator,
+    XDRMarshallImplementationGenerator,
+)
+
+
+def main():
+    top_srcdir = Path(__file__).parent.parent.parent.parent
+
+    parser = argparse.ArgumentParser("XDR visitor benchmark")
+    parser.add_argument(
+        "-n", "--count", type=int, default=20, help="Iterations per generator"
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default=str(Path(top_srcdir, "src", "remote", "remote_protocol.x")),
+        help="XDR input protocol file",
+    )
+    args = parser.parse_args()
+
+    with open(args.input, "r") as fp:
+        spec = XDRParser(fp).parse()
+
+    total = 0
+    for generator in [
+        XDRTypeDeclarationGenerator,
+        XDRTypeImplementationGenerator,
+        XDRMarshallDeclarationGenerator,
+        XDRMarshallImplementationGenerator,
+    ]:
+        secs = timeit.timeit(lambda: generator(spec).visit(), number=args.count)
+        total = total + secs
+        print("%-40s %8.2f ms/visit" % (generator.__name__, secs * 1000 / args.count))
+
+    print("%-40s %8.2f ms/visit" % ("total", total * 1000 / args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,688 @@
+import struct
+
+_int = struct.Struct(">i")
+_uint = struct.Struct(">I")
+_hyper = struct.Struct(">q")
+_uhyper = struct.Struct(">Q")
+_float = struct.Struct(">f")
+_double = struct.Struct(">d")
+
+_UNBOUNDED = 0xFFFFFFFF
+
+
+def pack(packer, value):
+    buf = bytearray()
+    packer(buf, value)
+    return bytes(buf)
+
+
+# Opaque data in the returned value is a memoryview
+# slice of 'data', so it is not copied. Each function
+# checks the length of 'data' before reading a value,
+# so truncated data is reported with its offset
+def unpack(unpacker, data):
+    value, offset = unpacker(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError("Trailing data after XDR value at offset %d" % offset)
+    return value
+
+
+def _pack_bool(buf, value):
+    buf += _uint.pack(1 if value else 0)
+
+
+def _unpack_bool(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (value,) = _uint.unpack_from(data, offset)
+    return value != 0, offset + 4
+
+
+def _pack_fixed_opaque(buf, value, length):
+    if len(value) != length:
+        raise ValueError("Opaque data length %d is not %d" % (len(value), length))
+    buf += value
+    buf += bytes(-length % 4)
+
+
+def _unpack_fixed_opaque(data, offset, length):
+    end = offset + length
+    if end + (-length % 4) > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    return data[offset:end], end + (-length % 4)
+
+
+def _pack_opaque(buf, value, maxlength):
+    if len(value) > maxlength:
+        raise ValueError("Opaque data length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    _pack_fixed_opaque(buf, value, len(value))
+
+
+def _unpack_opaque(data, offset, maxlength):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Opaque data length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_opaque(data, offset + 4, length)
+
+
+def _pack_string(buf, value, maxlength):
+    _pack_opaque(buf, value.encode("utf-8"), maxlength)
+
+
+def _unpack_string(data, offset, maxlength):
+    value, offset = _unpack_opaque(data, offset, maxlength)
+    return str(value, "utf-8"), offset
+
+
+def _pack_fixed_array(buf, value, length, packer):
+    if len(value) != length:
+        raise ValueError("Array length %d is not %d" % (len(value), length))
+    for element in value:
+        packer(buf, element)
+
+
+def _unpack_fixed_array(data, offset, length, unpacker):
+    value = []
+    for _ in range(length):
+        element, offset = unpacker(data, offset)
+        value.append(element)
+    return value, offset
+
+
+def _pack_fixed_scalar_array(buf, value, length, fmt):
+    buf += struct.pack(">%d%s" % (length, fmt), *value)
+
+
+def _unpack_fixed_scalar_array(data, offset, length, fmt):
+    fmt = struct.Struct(">%d%s" % (length, fmt))
+    if offset + fmt.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    return list(fmt.unpack_from(data, offset)), offset + fmt.size
+
+
+def _pack_scalar_array(buf, value, maxlength, fmt):
+    if len(value) > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    buf += struct.pack(">%d%s" % (len(value), fmt), *value)
+
+
+def _unpack_scalar_array(data, offset, maxlength, fmt):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_scalar_array(data, offset + 4, length, fmt)
+
+
+def _pack_array(buf, value, maxlength, packer):
+    if len(value) > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (len(value), maxlength))
+    buf += _uint.pack(len(value))
+    _pack_fixed_array(buf, value, len(value), packer)
+
+
+def _unpack_array(data, offset, maxlength, unpacker):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (length,) = _uint.unpack_from(data, offset)
+    if length > maxlength:
+        raise ValueError("Array length %d exceeds %d" % (length, maxlength))
+    return _unpack_fixed_array(data, offset + 4, length, unpacker)
+
+
+TEST_ENUM_ONE = 1
+TEST_ENUM_TWO = 2
+
+
+def pack_TestEnum(buf, value):
+    buf += _int.pack(value)
+
+
+def unpack_TestEnum(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (value,) = _int.unpack_from(data, offset)
+    return value, offset + 4
+
+
+_fmt_ii = struct.Struct(">ii")
+
+
+def pack_TestStruct(buf, value):
+    buf += _fmt_ii.pack(
+        value["c1"],
+        value["c2"],
+    )
+
+
+def unpack_TestStruct(data, offset):
+    obj = {}
+    if offset + 8 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (
+        obj["c1"],
+        obj["c2"],
+    ) = _fmt_ii.unpack_from(data, offset)
+    offset += 8
+    return obj, offset
+
+
+def pack_TestUnion(buf, value):
+    buf += _int.pack(value["type"])
+    if value["type"] == 20:
+        buf += _int.pack(value["i1"])
+    elif value["type"] == 30:
+        buf += _int.pack(value["i2"])
+    else:
+        buf += _int.pack(value["i3"])
+
+
+def unpack_TestUnion(data, offset):
+    obj = {}
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (obj["type"],) = _int.unpack_from(data, offset)
+    offset += 4
+    if obj["type"] == 20:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i1"],) = _int.unpack_from(data, offset)
+        offset += 4
+    elif obj["type"] == 30:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i2"],) = _int.unpack_from(data, offset)
+        offset += 4
+    else:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i3"],) = _int.unpack_from(data, offset)
+        offset += 4
+    return obj, offset
+
+
+def pack_TestUnionVoidDefault(buf, value):
+    buf += _int.pack(value["type"])
+    if value["type"] == 21:
+        buf += _int.pack(value["i1"])
+    elif value["type"] == 31:
+        buf += _int.pack(value["i2"])
+
+
+def unpack_TestUnionVoidDefault(data, offset):
+    obj = {}
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (obj["type"],) = _int.unpack_from(data, offset)
+    offset += 4
+    if obj["type"] == 21:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i1"],) = _int.unpack_from(data, offset)
+        offset += 4
+    elif obj["type"] == 31:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i2"],) = _int.unpack_from(data, offset)
+        offset += 4
+    return obj, offset
+
+
+def pack_TestUnionNoDefault(buf, value):
+    buf += _int.pack(value["type"])
+    if value["type"] == 22:
+        buf += _int.pack(value["i1"])
+    elif value["type"] == 32:
+        buf += _int.pack(value["i2"])
+    else:
+        raise ValueError("Invalid TestUnionNoDefault discriminator %r" % value["type"])
+
+
+def unpack_TestUnionNoDefault(data, offset):
+    obj = {}
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (obj["type"],) = _int.unpack_from(data, offset)
+    offset += 4
+    if obj["type"] == 22:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i1"],) = _int.unpack_from(data, offset)
+        offset += 4
+    elif obj["type"] == 32:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["i2"],) = _int.unpack_from(data, offset)
+        offset += 4
+    else:
+        raise ValueError("Invalid TestUnionNoDefault discriminator %r" % obj["type"])
+    return obj, offset
+
+
+def pack_TestIntScalar(buf, value):
+    buf += _int.pack(value)
+
+
+def unpack_TestIntScalar(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (value,) = _int.unpack_from(data, offset)
+    offset += 4
+    return value, offset
+
+
+def pack_TestIntPointer(buf, value):
+    if value is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        buf += _int.pack(value)
+
+
+def unpack_TestIntPointer(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        value = None
+    else:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (value,) = _int.unpack_from(data, offset)
+        offset += 4
+    return value, offset
+
+
+_fmt_3i = struct.Struct(">3i")
+
+
+def pack_TestIntFixedArray(buf, value):
+    buf += _fmt_3i.pack(*value)
+
+
+def unpack_TestIntFixedArray(data, offset):
+    if offset + _fmt_3i.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    value = list(_fmt_3i.unpack_from(data, offset))
+    offset += _fmt_3i.size
+    return value, offset
+
+
+def pack_TestIntVariableArray(buf, value):
+    _pack_scalar_array(buf, value, 5, "i")
+
+
+def unpack_TestIntVariableArray(data, offset):
+    value, offset = _unpack_scalar_array(data, offset, 5, "i")
+    return value, offset
+
+
+def pack_TestStringVariableArray(buf, value):
+    _pack_string(buf, value, 7)
+
+
+def unpack_TestStringVariableArray(data, offset):
+    value, offset = _unpack_string(data, offset, 7)
+    return value, offset
+
+
+def pack_TestOpaqueFixedArray(buf, value):
+    _pack_fixed_opaque(buf, value, 9)
+
+
+def unpack_TestOpaqueFixedArray(data, offset):
+    value, offset = _unpack_fixed_opaque(data, offset, 9)
+    return value, offset
+
+
+def pack_TestOpaqueVariableArray(buf, value):
+    _pack_opaque(buf, value, 11)
+
+
+def unpack_TestOpaqueVariableArray(data, offset):
+    value, offset = _unpack_opaque(data, offset, 11)
+    return value, offset
+
+
+def pack_TestEnumScalar(buf, value):
+    buf += _int.pack(value)
+
+
+def unpack_TestEnumScalar(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (value,) = _int.unpack_from(data, offset)
+    offset += 4
+    return value, offset
+
+
+def pack_TestEnumPointer(buf, value):
+    if value is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        buf += _int.pack(value)
+
+
+def unpack_TestEnumPointer(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        value = None
+    else:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (value,) = _int.unpack_from(data, offset)
+        offset += 4
+    return value, offset
+
+
+_fmt_13i = struct.Struct(">13i")
+
+
+def pack_TestEnumFixedArray(buf, value):
+    buf += _fmt_13i.pack(*value)
+
+
+def unpack_TestEnumFixedArray(data, offset):
+    if offset + _fmt_13i.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    value = list(_fmt_13i.unpack_from(data, offset))
+    offset += _fmt_13i.size
+    return value, offset
+
+
+def pack_TestEnumVariableArray(buf, value):
+    _pack_scalar_array(buf, value, 15, "i")
+
+
+def unpack_TestEnumVariableArray(data, offset):
+    value, offset = _unpack_scalar_array(data, offset, 15, "i")
+    return value, offset
+
+
+def pack_TestStructScalar(buf, value):
+    pack_TestStruct(buf, value)
+
+
+def unpack_TestStructScalar(data, offset):
+    value, offset = unpack_TestStruct(data, offset)
+    return value, offset
+
+
+def pack_TestStructPointer(buf, value):
+    if value is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        pack_TestStruct(buf, value)
+
+
+def unpack_TestStructPointer(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        value = None
+    else:
+        value, offset = unpack_TestStruct(data, offset)
+    return value, offset
+
+
+def pack_TestStructFixedArray(buf, value):
+    _pack_fixed_array(buf, value, 17, pack_TestStruct)
+
+
+def unpack_TestStructFixedArray(data, offset):
+    value, offset = _unpack_fixed_array(data, offset, 17, unpack_TestStruct)
+    return value, offset
+
+
+def pack_TestStructVariableArray(buf, value):
+    _pack_array(buf, value, 19, pack_TestStruct)
+
+
+def unpack_TestStructVariableArray(data, offset):
+    value, offset = _unpack_array(data, offset, 19, unpack_TestStruct)
+    return value, offset
+
+
+def pack_TestUnionScalar(buf, value):
+    pack_TestUnion(buf, value)
+
+
+def unpack_TestUnionScalar(data, offset):
+    value, offset = unpack_TestUnion(data, offset)
+    return value, offset
+
+
+def pack_TestUnionPointer(buf, value):
+    if value is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        pack_TestUnion(buf, value)
+
+
+def unpack_TestUnionPointer(data, offset):
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        value = None
+    else:
+        value, offset = unpack_TestUnion(data, offset)
+    return value, offset
+
+
+def pack_TestUnionFixedArray(buf, value):
+    _pack_fixed_array(buf, value, 21, pack_TestUnion)
+
+
+def unpack_TestUnionFixedArray(data, offset):
+    value, offset = _unpack_fixed_array(data, offset, 21, unpack_TestUnion)
+    return value, offset
+
+
+def pack_TestUnionVariableArray(buf, value):
+    _pack_array(buf, value, 23, pack_TestUnion)
+
+
+def unpack_TestUnionVariableArray(data, offset):
+    value, offset = _unpack_array(data, offset, 23, unpack_TestUnion)
+    return value, offset
+
+
+TestConstDec = 25
+TestConstHex = 0x27
+TestConstOct = 0o31
+
+
+_fmt_iIiIiIqQIfd = struct.Struct(">iIiIiIqQIfd")
+_fmt_25i = struct.Struct(">25i")
+_fmt_37i = struct.Struct(">37i")
+
+
+def pack_TestStructAllTypes(buf, value):
+    buf += _fmt_iIiIiIqQIfd.pack(
+        value["sc"],
+        value["suc"],
+        value["ss"],
+        value["sus"],
+        value["si"],
+        value["sui"],
+        value["sh"],
+        value["suh"],
+        1 if value["sb"] else 0,
+        value["sf"],
+        value["sd"],
+    )
+    if value["ip"] is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        buf += _int.pack(value["ip"])
+    buf += _fmt_25i.pack(*value["ifa"])
+    _pack_scalar_array(buf, value["iva"], TestConstHex, "i")
+    _pack_string(buf, value["stva"], TestConstOct)
+    _pack_fixed_opaque(buf, value["ofa"], 33)
+    _pack_opaque(buf, value["ova"], 35)
+    buf += _fmt_ii.pack(
+        value["e1"],
+        value["e2"],
+    )
+    if value["ep"] is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        buf += _int.pack(value["ep"])
+    buf += _fmt_37i.pack(*value["efa"])
+    _pack_scalar_array(buf, value["eva"], 39, "i")
+    pack_TestStruct(buf, value["s"])
+    if value["sp"] is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        pack_TestStruct(buf, value["sp"])
+    _pack_fixed_array(buf, value["sfa"], 41, pack_TestStruct)
+    _pack_array(buf, value["sva"], 43, pack_TestStruct)
+    pack_TestUnion(buf, value["u"])
+    if value["up"] is None:
+        buf += _uint.pack(0)
+    else:
+        buf += _uint.pack(1)
+        pack_TestUnion(buf, value["up"])
+    _pack_fixed_array(buf, value["ufa"], 45, pack_TestUnion)
+    _pack_array(buf, value["uva"], 47, pack_TestUnion)
+    buf += _int.pack(value["tis"])
+    pack_TestIntPointer(buf, value["tip"])
+    pack_TestIntFixedArray(buf, value["tifa"])
+    pack_TestIntVariableArray(buf, value["tiva"])
+    pack_TestStringVariableArray(buf, value["tstva"])
+    pack_TestOpaqueFixedArray(buf, value["tofa"])
+    pack_TestOpaqueVariableArray(buf, value["tova"])
+    buf += _int.pack(value["tes"])
+    pack_TestEnumPointer(buf, value["tep"])
+    pack_TestEnumFixedArray(buf, value["tefa"])
+    pack_TestEnumVariableArray(buf, value["teva"])
+    pack_TestStructScalar(buf, value["tss"])
+    pack_TestStructPointer(buf, value["tsp"])
+    pack_TestStructFixedArray(buf, value["tsfa"])
+    pack_TestStructVariableArray(buf, value["tsva"])
+    pack_TestUnionScalar(buf, value["tu"])
+    pack_TestUnionPointer(buf, value["tup"])
+    pack_TestUnionFixedArray(buf, value["tufa"])
+    pack_TestUnionVariableArray(buf, value["tuva"])
+
+
+def unpack_TestStructAllTypes(data, offset):
+    obj = {}
+    if offset + 56 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (
+        obj["sc"],
+        obj["suc"],
+        obj["ss"],
+        obj["sus"],
+        obj["si"],
+        obj["sui"],
+        obj["sh"],
+        obj["suh"],
+        obj["sb"],
+        obj["sf"],
+        obj["sd"],
+    ) = _fmt_iIiIiIqQIfd.unpack_from(data, offset)
+    offset += 56
+    obj["sb"] = obj["sb"] != 0
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        obj["ip"] = None
+    else:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["ip"],) = _int.unpack_from(data, offset)
+        offset += 4
+    if offset + _fmt_25i.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    obj["ifa"] = list(_fmt_25i.unpack_from(data, offset))
+    offset += _fmt_25i.size
+    obj["iva"], offset = _unpack_scalar_array(data, offset, TestConstHex, "i")
+    obj["stva"], offset = _unpack_string(data, offset, TestConstOct)
+    obj["ofa"], offset = _unpack_fixed_opaque(data, offset, 33)
+    obj["ova"], offset = _unpack_opaque(data, offset, 35)
+    if offset + 8 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (
+        obj["e1"],
+        obj["e2"],
+    ) = _fmt_ii.unpack_from(data, offset)
+    offset += 8
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        obj["ep"] = None
+    else:
+        if offset + 4 > len(data):
+            raise ValueError("Truncated XDR data at offset %d" % offset)
+        (obj["ep"],) = _int.unpack_from(data, offset)
+        offset += 4
+    if offset + _fmt_37i.size > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    obj["efa"] = list(_fmt_37i.unpack_from(data, offset))
+    offset += _fmt_37i.size
+    obj["eva"], offset = _unpack_scalar_array(data, offset, 39, "i")
+    obj["s"], offset = unpack_TestStruct(data, offset)
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        obj["sp"] = None
+    else:
+        obj["sp"], offset = unpack_TestStruct(data, offset)
+    obj["sfa"], offset = _unpack_fixed_array(data, offset, 41, unpack_TestStruct)
+    obj["sva"], offset = _unpack_array(data, offset, 43, unpack_TestStruct)
+    obj["u"], offset = unpack_TestUnion(data, offset)
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    offset += 4
+    if _uint.unpack_from(data, offset - 4)[0] == 0:
+        obj["up"] = None
+    else:
+        obj["up"], offset = unpack_TestUnion(data, offset)
+    obj["ufa"], offset = _unpack_fixed_array(data, offset, 45, unpack_TestUnion)
+    obj["uva"], offset = _unpack_array(data, offset, 47, unpack_TestUnion)
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (obj["tis"],) = _int.unpack_from(data, offset)
+    offset += 4
+    obj["tip"], offset = unpack_TestIntPointer(data, offset)
+    obj["tifa"], offset = unpack_TestIntFixedArray(data, offset)
+    obj["tiva"], offset = unpack_TestIntVariableArray(data, offset)
+    obj["tstva"], offset = unpack_TestStringVariableArray(data, offset)
+    obj["tofa"], offset = unpack_TestOpaqueFixedArray(data, offset)
+    obj["tova"], offset = unpack_TestOpaqueVariableArray(data, offset)
+    if offset + 4 > len(data):
+        raise ValueError("Truncated XDR data at offset %d" % offset)
+    (obj["tes"],) = _int.unpack_from(data, offset)
+    offset += 4
+    obj["tep"], offset = unpack_TestEnumPointer(data, offset)
+    obj["tefa"], offset = unpack_TestEnumFixedArray(data, offset)
+    obj["teva"], offset = unpack_TestEnumVariableArray(data, offset)
+    obj["tss"], offset = unpack_TestStructScalar(data, offset)
+    obj["tsp"], offset = unpack_TestStructPointer(data, offset)
+    obj["tsfa"], offset = unpack_TestStructFixedArray(data, offset)
+    obj["tsva"], offset = unpack_TestStructVariableArray(data, offset)
+    obj["tu"], offset = unpack_TestUnionScalar(data, offset)
+    obj["tup"], offset = unpack_TestUnionPointer(data, offset)
+    obj["tufa"], offset = unpack_TestUnionFixedArray(data, offset)
+    obj["tuva"], offset = unpack_TestUnionVariableArray(data, offset)
+    return obj, offset
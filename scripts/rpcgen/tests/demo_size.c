@@ -0,0 +1,223 @@
+size_t
+xdr_TestStruct_size(const TestStruct *objp G_GNUC_UNUSED)
+{
+    return XDR_TestStruct_SIZE;
+}
+
+size_t
+xdr_TestUnion_size(const TestUnion *objp G_GNUC_UNUSED)
+{
+    return XDR_TestUnion_SIZE;
+}
+
+size_t
+xdr_TestUnionVoidDefault_size(const TestUnionVoidDefault *objp)
+{
+    size_t size = 4;
+
+    switch (objp->type) {
+    case 21:
+        size += 4;
+        break;
+    case 31:
+        size += 4;
+        break;
+    default:
+        break;
+    }
+    return size;
+}
+
+size_t
+xdr_TestUnionNoDefault_size(const TestUnionNoDefault *objp G_GNUC_UNUSED)
+{
+    return XDR_TestUnionNoDefault_SIZE;
+}
+
+size_t
+xdr_TestIntScalar_size(const TestIntScalar *objp G_GNUC_UNUSED)
+{
+    return XDR_TestIntScalar_SIZE;
+}
+
+size_t
+xdr_TestIntPointer_size(const TestIntPointer *objp)
+{
+    size_t size = 0;
+
+    size += 4;
+    if (*objp)
+        size += 4;
+    return size;
+}
+
+size_t
+xdr_TestIntFixedArray_size(const TestIntFixedArray objp G_GNUC_UNUSED)
+{
+    return XDR_TestIntFixedArray_SIZE;
+}
+
+size_t
+xdr_TestIntVariableArray_size(const TestIntVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + objp->TestIntVariableArray_len * 4;
+    return size;
+}
+
+size_t
+xdr_TestStringVariableArray_size(const TestStringVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + RNDUP(*objp ? strlen(*objp) : 0);
+    return size;
+}
+
+size_t
+xdr_TestOpaqueFixedArray_size(const TestOpaqueFixedArray objp G_GNUC_UNUSED)
+{
+    return XDR_TestOpaqueFixedArray_SIZE;
+}
+
+size_t
+xdr_TestOpaqueVariableArray_size(const TestOpaqueVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + RNDUP(objp->TestOpaqueVariableArray_len);
+    return size;
+}
+
+size_t
+xdr_TestEnumScalar_size(const TestEnumScalar *objp G_GNUC_UNUSED)
+{
+    return XDR_TestEnumScalar_SIZE;
+}
+
+size_t
+xdr_TestEnumPointer_size(const TestEnumPointer *objp)
+{
+    size_t size = 0;
+
+    size += 4;
+    if (*objp)
+        size += 4;
+    return size;
+}
+
+size_t
+xdr_TestEnumFixedArray_size(const TestEnumFixedArray objp G_GNUC_UNUSED)
+{
+    return XDR_TestEnumFixedArray_SIZE;
+}
+
+size_t
+xdr_TestEnumVariableArray_size(const TestEnumVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + objp->TestEnumVariableArray_len * 4;
+    return size;
+}
+
+size_t
+xdr_TestStructScalar_size(const TestStructScalar *objp G_GNUC_UNUSED)
+{
+    return XDR_TestStructScalar_SIZE;
+}
+
+size_t
+xdr_TestStructPointer_size(const TestStructPointer *objp)
+{
+    size_t size = 0;
+
+    size += 4;
+    if (*objp)
+        size += 8;
+    return size;
+}
+
+size_t
+xdr_TestStructFixedArray_size(const TestStructFixedArray objp G_GNUC_UNUSED)
+{
+    return XDR_TestStructFixedArray_SIZE;
+}
+
+size_t
+xdr_TestStructVariableArray_size(const TestStructVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + objp->TestStructVariableArray_len * 8;
+    return size;
+}
+
+size_t
+xdr_TestUnionScalar_size(const TestUnionScalar *objp G_GNUC_UNUSED)
+{
+    return XDR_TestUnionScalar_SIZE;
+}
+
+size_t
+xdr_TestUnionPointer_size(const TestUnionPointer *objp)
+{
+    size_t size = 0;
+
+    size += 4;
+    if (*objp)
+        size += 8;
+    return size;
+}
+
+size_t
+xdr_TestUnionFixedArray_size(const TestUnionFixedArray objp G_GNUC_UNUSED)
+{
+    return XDR_TestUnionFixedArray_SIZE;
+}
+
+size_t
+xdr_TestUnionVariableArray_size(const TestUnionVariableArray *objp)
+{
+    size_t size = 0;
+
+    size += 4 + objp->TestUnionVariableArray_len * 8;
+    return size;
+}
+
+size_t
+xdr_TestStructAllTypes_size(const TestStructAllTypes *objp)
+{
+    size_t size = 1456;
+
+    size += 4;
+    if (objp->ip)
+        size += 4;
+    size += 4 + objp->iva.iva_len * 4;
+    size += 4 + RNDUP(objp->stva ? strlen(objp->stva) : 0);
+    size += 4 + RNDUP(objp->ova.ova_len);
+    size += 4;
+    if (objp->ep)
+        size += 4;
+    size += 4 + objp->eva.eva_len * 4;
+    size += 4;
+    if (objp->sp)
+        size += 8;
+    size += 4 + objp->sva.sva_len * 8;
+    size += 4;
+    if (objp->up)
+        size += 8;
+    size += 4 + objp->uva.uva_len * 8;
+    size += xdr_TestIntPointer_size(&objp->tip);
+    size += xdr_TestIntVariableArray_size(&objp->tiva);
+    size += xdr_TestStringVariableArray_size(&objp->tstva);
+    size += xdr_TestOpaqueVariableArray_size(&objp->tova);
+    size += xdr_TestEnumPointer_size(&objp->tep);
+    size += xdr_TestEnumVariableArray_size(&objp->teva);
+    size += xdr_TestStructPointer_size(&objp->tsp);
+    size += xdr_TestStructVariableArray_size(&objp->tsva);
+    size += xdr_TestUnionPointer_size(&objp->tup);
+    size += xdr_TestUnionVariableArray_size(&objp->tuva);
+    return size;
+}
@@ -0,0 +1,59 @@
+#define XDR_TestStruct_SIZE 8
+extern size_t xdr_TestStruct_size(const TestStruct *objp);
+
+#define XDR_TestUnion_SIZE 8
+extern size_t xdr_TestUnion_size(const TestUnion *objp);
+
+extern size_t xdr_TestUnionVoidDefault_size(const TestUnionVoidDefault *objp);
+
+#define XDR_TestUnionNoDefault_SIZE 8
+extern size_t xdr_TestUnionNoDefault_size(const TestUnionNoDefault *objp);
+
+#define XDR_TestIntScalar_SIZE 4
+extern size_t xdr_TestIntScalar_size(const TestIntScalar *objp);
+
+extern size_t xdr_TestIntPointer_size(const TestIntPointer *objp);
+
+#define XDR_TestIntFixedArray_SIZE 12
+extern size_t xdr_TestIntFixedArray_size(const TestIntFixedArray objp);
+
+extern size_t xdr_TestIntVariableArray_size(const TestIntVariableArray *objp);
+
+extern size_t xdr_TestStringVariableArray_size(const TestStringVariableArray *objp);
+
+#define XDR_TestOpaqueFixedArray_SIZE 12
+extern size_t xdr_TestOpaqueFixedArray_size(const TestOpaqueFixedArray objp);
+
+extern size_t xdr_TestOpaqueVariableArray_size(const TestOpaqueVariableArray *objp);
+
+#define XDR_TestEnumScalar_SIZE 4
+extern size_t xdr_TestEnumScalar_size(const TestEnumScalar *objp);
+
+extern size_t xdr_TestEnumPointer_size(const TestEnumPointer *objp);
+
+#define XDR_TestEnumFixedArray_SIZE 52
+extern size_t xdr_TestEnumFixedArray_size(const TestEnumFixedArray objp);
+
+extern size_t xdr_TestEnumVariableArray_size(const TestEnumVariableArray *objp);
+
+#define XDR_TestStructScalar_SIZE 8
+extern size_t xdr_TestStructScalar_size(const TestStructScalar *objp);
+
+extern size_t xdr_TestStructPointer_size(const TestStructPointer *objp);
+
+#define XDR_TestStructFixedArray_SIZE 136
+extern size_t xdr_TestStructFixedArray_size(const TestStructFixedArray objp);
+
+extern size_t xdr_TestStructVariableArray_size(const TestStructVariableArray *objp);
+
+#define XDR_TestUnionScalar_SIZE 8
+extern size_t xdr_TestUnionScalar_size(const TestUnionScalar *objp);
+
+extern size_t xdr_TestUnionPointer_size(const TestUnionPointer *objp);
+
+#define XDR_TestUnionFixedArray_SIZE 168
+extern size_t xdr_TestUnionFixedArray_size(const TestUnionFixedArray objp);
+
+extern size_t xdr_TestUnionVariableArray_size(const TestUnionVariableArray *objp);
+
+extern size_t xdr_TestStructAllTypes_size(const TestStructAllTypes *objp);
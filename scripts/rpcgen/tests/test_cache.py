@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: LGPL-2.1-or-later
+
+import os
+from pathlib import Path
+
+from rpcgen.cache import XDRSpecificationCache
+from rpcgen.parser import XDRParser
+
+
+def parse_simple():
+    p = Path(Path(__file__).parent, "simple.x")
+    with p.open("r") as fp:
+        parser = XDRParser(fp)
+        return parser.parse()
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = XDRSpecificationCache(tmp_path)
+    spec = parse_simple()
+
+    key = cache.key(b"simple")
+    assert cache.load(key) is None
+
+    cache.store(key, spec)
+    got = cache.load(key)
+
+    assert got is not None
+    assert str(got) == str(spec)
+
+
+def test_cache_key():
+    cache = XDRSpecificationCache("unused")
+
+    assert cache.key(b"one") == cache.key(b"one")
+    assert cache.key(b"one") != cache.key(b"two")
+
+
+def test_cache_corrupt(tmp_path):
+    cache = XDRSpecificationCache(tmp_path)
+
+    key = cache.key(b"corrupt")
+    cache.path(key).write_bytes(b"not a pickle")
+
+    assert cache.load(key) is None
+
+
+def test_cache_evict(tmp_path):
+    spec = parse_simple()
+    cache = XDRSpecificationCache(tmp_path)
+    cache.store(cache.key(b"size"), spec)
+    size = cache.path(cache.key(b"size")).stat().st_size
+    cache.path(cache.key(b"size")).unlink()
+
+    cache = XDRSpecificationCache(tmp_path, maxsize=size * 2)
+    keys = [cache.key(b"%d" % i) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.store(key, spec)
+        os.utime(cache.path(key), (i, i))
+
+    cache.evict()
+
+    assert not cache.path(keys[0]).exists()
+    assert not cache.path(keys[1]).exists()
+    assert cache.path(keys[2]).exists()
+    assert cache.path(keys[3]).exists()
+
+
+def test_cache_store_failure(tmp_path):
+    cache = XDRSpecificationCache(tmp_path)
+
+    key = cache.key(b"unpicklable")
+    cache.store(key, lambda: None)
+
+    assert cache.load(key) is None
+    assert list(tmp_path.iterdir()) == []
@@ -10,6 +10,8 @@
 
 #include "demo.h"
 #include "demo.c"
+#include "demo_size.h"
+#include "demo_size.c"
 
 static void test_xdr(xdrproc_t proc, void *vorig, void *vnew, const char *testname, bool fail)
 {
@@ -82,6 +84,22 @@ static void test_xdr(xdrproc_t proc, void *vorig, void *vnew, const char *testna
     xdr_destroy(&xdr);
 }
 
+static void test_xdr_size(size_t size, const char *testname)
+{
+    g_autofree char *expfile = g_strdup_printf(abs_srcdir "/test_demo_%s.bin", testname);
+    g_autofree char *expected = NULL;
+    size_t explen;
+    g_autoptr(GError) err = NULL;
+
+    g_file_get_contents(expfile, &expected, &explen, &err);
+    if (err != NULL) {
+        g_printerr("%s\n", err->message);
+        abort();
+    }
+
+    g_assert_cmpint(explen, ==, size);
+}
+
 static void test_enum(void)
 {
     TestEnum vorig = TEST_ENUM_TWO;
@@ -98,6 +116,7 @@ static void test_struct(void)
     g_auto(TestStruct) vnew = {0};
 
     test_xdr((xdrproc_t)xdr_TestStruct, &vorig, &vnew, "struct", false);
+    test_xdr_size(xdr_TestStruct_size(&vorig), "struct");
 }
 
 static void test_union_case(void)
@@ -108,6 +127,7 @@ static void test_union_case(void)
     g_auto(TestUnion) vnew = {0};
 
     test_xdr((xdrproc_t)xdr_TestUnion, &vorig, &vnew, "union_case", false);
+    test_xdr_size(xdr_TestUnion_size(&vorig), "union_case");
 }
 
 static void test_union_default(void)
@@ -128,6 +148,7 @@ static void test_union_void_default_case(void)
     g_auto(TestUnionVoidDefault) vnew = {0};
 
     test_xdr((xdrproc_t)xdr_TestUnionVoidDefault, &vorig, &vnew, "union_void_default_case", false);
+    test_xdr_size(xdr_TestUnionVoidDefault_size(&vorig), "union_void_default_case");
 }
 
 static void test_union_void_default_default(void)
@@ -138,6 +159,7 @@ static void test_union_void_default_default(void)
     g_auto(TestUnionVoidDefault) vnew = {0};
 
     test_xdr((xdrproc_t)xdr_TestUnionVoidDefault, &vorig, &vnew, "union_void_default_default", false);
+    test_xdr_size(xdr_TestUnionVoidDefault_size(&vorig), "union_void_default_default");
 }
 
 static void test_union_no_default_case(void)
@@ -175,6 +197,7 @@ static void test_int_pointer_set(void)
     g_auto(TestIntPointer) vnew = NULL;
 
     test_xdr((xdrproc_t)xdr_TestIntPointer, &vorig, &vnew, "int_pointer_set", false);
+    test_xdr_size(xdr_TestIntPointer_size(&vorig), "int_pointer_set");
 }
 
 static void test_int_pointer_null(void)
@@ -183,6 +206,7 @@ static void test_int_pointer_null(void)
     g_auto(TestIntPointer) vnew = NULL;
 
     test_xdr((xdrproc_t)xdr_TestIntPointer, &vorig, &vnew, "int_pointer_null", false);
+    test_xdr_size(xdr_TestIntPointer_size(&vorig), "int_pointer_null");
 }
 
 static void test_int_fixed_array(void)
@@ -192,6 +216,7 @@ static void test_int_fixed_array(void)
 
     test_xdr((xdrproc_t)xdr_TestIntFixedArray,
              vorig, vnew, "int_fixed_array", false);
+    test_xdr_size(xdr_TestIntFixedArray_size(vorig), "int_fixed_array");
 }
 
 static void test_int_variable_array_set(void)
@@ -204,6 +229,7 @@ static void test_int_variable_array_set(void)
 
     test_xdr((xdrproc_t)xdr_TestIntVariableArray,
              &vorig, &vnew, "int_variable_array_set", false);
+    test_xdr_size(xdr_TestIntVariableArray_size(&vorig), "int_variable_array_set");
 }
 
 static void test_int_variable_array_overflow(void)
@@ -237,6 +263,7 @@ static void test_string_variable_array_set(void)
 
     test_xdr((xdrproc_t)xdr_TestStringVariableArray,
              &vorig, &vnew, "string_variable_array_set", false);
+    test_xdr_size(xdr_TestStringVariableArray_size(&vorig), "string_variable_array_set");
 }
 
 static void test_string_variable_array_empty(void)
@@ -246,6 +273,7 @@ static void test_string_variable_array_empty(void)
 
     test_xdr((xdrproc_t)xdr_TestStringVariableArray,
              &vorig, &vnew, "string_variable_array_empty", false);
+    test_xdr_size(xdr_TestStringVariableArray_size(&vorig), "string_variable_array_empty");
 }
 
 static void test_opaque_fixed_array(void)
@@ -266,6 +294,7 @@ static void test_opaque_variable_array_set(void)
 
     test_xdr((xdrproc_t)xdr_TestOpaqueVariableArray,
              &vorig, &vnew, "opaque_variable_array_set", false);
+    test_xdr_size(xdr_TestOpaqueVariableArray_size(&vorig), "opaque_variable_array_set");
 }
 
 static void test_opaque_variable_array_overflow(void)
@@ -723,6 +752,7 @@ static void test_struct_all_types(void)
 
     test_xdr((xdrproc_t)xdr_TestStructAllTypes,
              &vorig, &vnew, "test_struct_all_types", false);
+    test_xdr_size(xdr_TestStructAllTypes_size(&vorig), "test_struct_all_types");
 }
 
 int main(int argc, char **argv)
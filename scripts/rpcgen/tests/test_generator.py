@@ -1,14 +1,23 @@
 # SPDX-License-Identifier: LGPL-2.1-or-later
 
+import io
 import os
+import types
 from pathlib import Path
 
+import pytest
+
 from rpcgen.parser import XDRParser
 from rpcgen.generator import (
+    zero_copy_fields,
     XDRTypeDeclarationGenerator,
     XDRTypeImplementationGenerator,
     XDRMarshallDeclarationGenerator,
     XDRMarshallImplementationGenerator,
+    XDRSizeDeclarationGenerator,
+    XDRSizeImplementationGenerator,
+    XDRPythonCodecGenerator,
+    XDRBenchmarkGenerator,
 )
 
 
@@ -58,3 +67,351 @@ def test_generate_source():
             fp.write(want)
 
     assert got == want
+
+
+def test_generate_size_header():
+    x = Path(Path(__file__).parent, "demo.x")
+    h = Path(Path(__file__).parent, "demo_size.h")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    got = XDRSizeDeclarationGenerator(spec).visit()
+
+    with h.open("r") as fp:
+        want = fp.read()
+
+    if "VIR_TEST_REGENERATE_OUTPUT" in os.environ:
+        want = got
+        with h.open("w") as fp:
+            fp.write(want)
+
+    assert got == want
+
+
+def test_generate_size_source():
+    x = Path(Path(__file__).parent, "demo.x")
+    h = Path(Path(__file__).parent, "demo_size.c")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    got = XDRSizeImplementationGenerator(spec).visit()
+
+    with h.open("r") as fp:
+        want = fp.read()
+
+    if "VIR_TEST_REGENERATE_OUTPUT" in os.environ:
+        want = got
+        with h.open("w") as fp:
+            fp.write(want)
+
+    assert got == want
+
+
+def test_generate_emit():
+    x = Path(Path(__file__).parent, "demo.x")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    for generator in [
+        XDRTypeDeclarationGenerator,
+        XDRTypeImplementationGenerator,
+        XDRMarshallDeclarationGenerator,
+        XDRMarshallImplementationGenerator,
+        XDRSizeDeclarationGenerator,
+        XDRSizeImplementationGenerator,
+    ]:
+        sink = io.StringIO()
+        generator(spec).emit(sink)
+
+        assert sink.getvalue() == generator(spec).visit()
+
+
+def test_generate_source_inline():
+    x = Path(Path(__file__).parent, "demo.x")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    got = XDRMarshallImplementationGenerator(spec, inline=True).visit()
+
+    want = (
+        "bool_t\n"
+        + "xdr_TestStruct(XDR *xdrs, TestStruct *objp)\n"
+        + "{\n"
+        + "    int32_t *buf;\n"
+        + "\n"
+        + "    if (xdrs->x_op == XDR_ENCODE) {\n"
+        + "        buf = XDR_INLINE(xdrs, 2 * BYTES_PER_XDR_UNIT);\n"
+        + "        if (buf != NULL) {\n"
+        + "            IXDR_PUT_INT32(buf, objp->c1);\n"
+        + "            IXDR_PUT_INT32(buf, objp->c2);\n"
+        + "            return TRUE;\n"
+        + "        }\n"
+        + "    } else if (xdrs->x_op == XDR_DECODE) {\n"
+        + "        buf = XDR_INLINE(xdrs, 2 * BYTES_PER_XDR_UNIT);\n"
+        + "        if (buf != NULL) {\n"
+        + "            objp->c1 = IXDR_GET_INT32(buf);\n"
+        + "            objp->c2 = IXDR_GET_INT32(buf);\n"
+        + "            return TRUE;\n"
+        + "        }\n"
+        + "    }\n"
+        + "    if (!xdr_char(xdrs, &objp->c1))\n"
+        + "        return FALSE;\n"
+        + "    if (!xdr_char(xdrs, &objp->c2))\n"
+        + "        return FALSE;\n"
+        + "    return TRUE;\n"
+        + "}\n"
+    )
+
+    assert want in got
+    # Structs with variable sized fields keep the per-field calls only
+    assert got.count("XDR_INLINE") == 2
+
+
+def test_generate_zero_copy():
+    x = Path(Path(__file__).parent, "demo.x")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    zerocopy = ["TestStructAllTypes.ova", "TestStructAllTypes.tstva"]
+
+    got = XDRTypeDeclarationGenerator(spec, zerocopy=zerocopy).visit()
+
+    want = (
+        "    struct {\n"
+        + "        u_int tstva_len;\n"
+        + "        char *tstva_val;\n"
+        + "    } tstva;\n"
+    )
+
+    assert want in got
+
+    got = XDRMarshallImplementationGenerator(spec, zerocopy=zerocopy).visit()
+
+    want = (
+        "    if (xdrs->x_op == XDR_DECODE) {\n"
+        + "        if (!xdr_u_int(xdrs, &objp->ova.ova_len))\n"
+        + "            return FALSE;\n"
+        + "        if (objp->ova.ova_len > 35)\n"
+        + "            return FALSE;\n"
+        + "        objp->ova.ova_val = (char *)XDR_INLINE(xdrs, RNDUP(objp->ova.ova_len));\n"
+        + "        if (objp->ova.ova_val == NULL)\n"
+        + "            return FALSE;\n"
+        + "    } else if (xdrs->x_op == XDR_FREE) {\n"
+        + "        objp->ova.ova_val = NULL;\n"
+        + "        objp->ova.ova_len = 0;\n"
+        + "    } else if (!xdr_bytes(xdrs, (char **)&objp->ova.ova_val, "
+        + "(u_int *) &objp->ova.ova_len, 35)) {\n"
+        + "        return FALSE;\n"
+        + "    }\n"
+    )
+
+    assert want in got
+    assert "xdr_TestStringVariableArray(xdrs, &objp->tstva)" not in got
+
+    with pytest.raises(Exception):
+        XDRMarshallImplementationGenerator(spec, zerocopy=["TestStructAllTypes.sc"])
+
+    # Structs from other input files are left to them
+    assert zero_copy_fields(spec, ["OtherStruct.ova"]) == {}
+
+
+def load_python_codec():
+    x = Path(Path(__file__).parent, "demo.x")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    codec = types.ModuleType("demo")
+    exec(XDRPythonCodecGenerator(spec).visit(), codec.__dict__)
+    return codec
+
+
+def test_generate_python():
+    x = Path(Path(__file__).parent, "demo.x")
+    h = Path(Path(__file__).parent, "demo.py")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    got = XDRPythonCodecGenerator(spec).visit()
+
+    with h.open("r") as fp:
+        want = fp.read()
+
+    if "VIR_TEST_REGENERATE_OUTPUT" in os.environ:
+        want = got
+        with h.open("w") as fp:
+            fp.write(want)
+
+    assert got == want
+
+
+@pytest.mark.parametrize(
+    "testname,typename",
+    [
+        ("enum", "TestEnum"),
+        ("struct", "TestStruct"),
+        ("union_case", "TestUnion"),
+        ("union_default", "TestUnion"),
+        ("union_void_default_case", "TestUnionVoidDefault"),
+        ("union_void_default_default", "TestUnionVoidDefault"),
+        ("union_no_default_case", "TestUnionNoDefault"),
+        ("int_scalar", "TestIntScalar"),
+        ("int_pointer_set", "TestIntPointer"),
+        ("int_pointer_null", "TestIntPointer"),
+        ("int_fixed_array", "TestIntFixedArray"),
+        ("int_variable_array_set", "TestIntVariableArray"),
+        ("int_variable_array_empty", "TestIntVariableArray"),
+        ("string_variable_array_set", "TestStringVariableArray"),
+        ("string_variable_array_empty", "TestStringVariableArray"),
+        ("opaque_fixed_array", "TestOpaqueFixedArray"),
+        ("opaque_variable_array_set", "TestOpaqueVariableArray"),
+        ("opaque_variable_array_empty", "TestOpaqueVariableArray"),
+        ("enum_scalar", "TestEnumScalar"),
+        ("enum_pointer_set", "TestEnumPointer"),
+        ("enum_pointer_null", "TestEnumPointer"),
+        ("enum_fixed_array", "TestEnumFixedArray"),
+        ("enum_variable_array_set", "TestEnumVariableArray"),
+        ("enum_variable_array_empty", "TestEnumVariableArray"),
+        ("struct_scalar", "TestStructScalar"),
+        ("struct_pointer_set", "TestStructPointer"),
+        ("struct_pointer_null", "TestStructPointer"),
+        ("struct_fixed_array", "TestStructFixedArray"),
+        ("struct_variable_array_set", "TestStructVariableArray"),
+        ("struct_variable_array_empty", "TestStructVariableArray"),
+        ("union_scalar", "TestUnionScalar"),
+        ("union_pointer_set", "TestUnionPointer"),
+        ("union_pointer_null", "TestUnionPointer"),
+        ("union_fixed_array", "TestUnionFixedArray"),
+        ("union_variable_array_set", "TestUnionVariableArray"),
+        ("union_variable_array_empty", "TestUnionVariableArray"),
+        ("test_struct_all_types", "TestStructAllTypes"),
+    ],
+)
+def test_python_codec_roundtrip(testname, typename):
+    codec = load_python_codec()
+    data = Path(Path(__file__).parent, "test_demo_%s.bin" % testname).read_bytes()
+
+    value = codec.unpack(getattr(codec, "unpack_" + typename), data)
+
+    assert codec.pack(getattr(codec, "pack_" + typename), value) == data
+
+
+@pytest.mark.parametrize(
+    "testname,typename,value",
+    [
+        ("enum", "TestEnum", 2),
+        ("struct", "TestStruct", {"c1": ord("a"), "c2": ord("b")}),
+        ("union_case", "TestUnion", {"type": 20, "i1": 1729}),
+        ("union_void_default_default", "TestUnionVoidDefault", {"type": 87539319}),
+        ("int_pointer_null", "TestIntPointer", None),
+        ("int_fixed_array", "TestIntFixedArray", [1729, 0, 87539319]),
+        ("int_variable_array_set", "TestIntVariableArray", [1729, 0, 87539319]),
+        ("string_variable_array_set", "TestStringVariableArray", "taxis"),
+        (
+            "opaque_variable_array_set",
+            "TestOpaqueVariableArray",
+            bytes([0xCA, 0xFE, 0x12]),
+        ),
+    ],
+)
+def test_python_codec_values(testname, typename, value):
+    codec = load_python_codec()
+    data = Path(Path(__file__).parent, "test_demo_%s.bin" % testname).read_bytes()
+
+    assert codec.pack(getattr(codec, "pack_" + typename), value) == data
+    assert codec.unpack(getattr(codec, "unpack_" + typename), data) == value
+
+
+def test_python_codec_errors():
+    codec = load_python_codec()
+
+    with pytest.raises(ValueError):
+        codec.pack(codec.pack_TestIntVariableArray, [1, 2, 3, 4, 5, 6])
+    with pytest.raises(ValueError):
+        codec.pack(codec.pack_TestUnionNoDefault, {"type": 87539319})
+    with pytest.raises(ValueError):
+        codec.unpack(codec.unpack_TestStringVariableArray, b"\0\0\0\x05abc")
+    with pytest.raises(ValueError):
+        codec.unpack(codec.unpack_TestIntScalar, b"\0\0\0\x05\0")
+    with pytest.raises(ValueError, match="Truncated XDR data at offset 0"):
+        codec.unpack(codec.unpack_TestIntScalar, b"\0\0")
+    with pytest.raises(ValueError, match="Truncated XDR data at offset 4"):
+        codec.unpack(codec.unpack_TestIntPointer, b"\0\0\0\x01\0\0")
+    with pytest.raises(ValueError, match="Truncated XDR data at offset 4"):
+        codec.unpack(codec.unpack_TestIntVariableArray, b"\0\0\0\x02\0\0\0\x01")
+
+
+def test_generate_python_missing_constants():
+    spec = XDRParser(io.StringIO("const MAX = VIR_BUFLEN;\n")).parse()
+
+    sink = io.StringIO()
+    with pytest.raises(Exception, match="VIR_BUFLEN"):
+        XDRPythonCodecGenerator(spec).emit(sink)
+    assert sink.getvalue() == ""
+
+    XDRPythonCodecGenerator(spec, [("VIR_BUFLEN", "16")]).visit()
+
+
+def test_generate_bench():
+    x = Path(Path(__file__).parent, "demo.x")
+    with x.open("r") as fp:
+        parser = XDRParser(fp)
+        spec = parser.parse()
+
+    got = XDRBenchmarkGenerator(spec).visit()
+
+    want = (
+        "static void\n"
+        + "bench_fill_TestUnion(TestUnion *objp, int depth BENCH_UNUSED)\n"
+        + "{\n"
+        + "    objp->type = 20;\n"
+        + "    objp->TestUnion_u.i1 = -1729;\n"
+        + "}\n"
+    )
+
+    assert want in got
+
+    want = (
+        "static void\n"
+        + "bench_TestStruct(size_t iterations)\n"
+        + "{\n"
+        + "    TestStruct value;\n"
+        + "    TestStruct decoded;\n"
+        + "\n"
+        + "    memset(&value, 0, sizeof(value));\n"
+        + "    bench_fill_TestStruct(&value, 0);\n"
+        + '    bench_run("TestStruct", (xdrproc_t)xdr_TestStruct, &value,\n'
+        + "              &decoded, sizeof(decoded), iterations);\n"
+        + "    xdr_free((xdrproc_t)xdr_TestStruct, (char *)&value);\n"
+        + "}\n"
+    )
+
+    assert want in got
+    # Only structs are benchmarked
+    assert "    bench_TestStruct(iterations);\n" in got
+    assert "    bench_TestStructAllTypes(iterations);\n" in got
+    assert "bench_TestUnion(" not in got
+
+
+def test_generate_bench_external_types():
+    spec = XDRParser(
+        io.StringIO(
+            "struct local { int i; };\n"
+            + "struct uses_remote { remote_domain dom; };\n"
+            + "struct uses_indirectly { uses_remote *next; local l; };\n"
+        )
+    ).parse()
+
+    generator = XDRBenchmarkGenerator(spec)
+    got = generator.visit()
+
+    assert generator.skipped == ["uses_remote", "uses_indirectly"]
+    assert "    bench_local(iterations);\n" in got
+    assert "bench_fill_uses_remote" not in got
+    assert "bench_fill_uses_indirectly" not in got
@@ -2,8 +2,11 @@
 
 from pathlib import Path
 
+import pytest
+
 from rpcgen.lexer import (
     XDRLexer,
+    XDRLegacyLexer,
     XDRTokenIdentifier,
     XDRTokenPunctuation,
     XDRTokenConstant,
@@ -114,3 +117,32 @@ def test_lexer():
         XDRTokenPunctuation(line=35, column=0, value="}"),
         XDRTokenPunctuation(line=35, column=1, value=";"),
     ]
+
+
+def all_tokens(lexer):
+    tokens = []
+    while True:
+        tok = lexer.next()
+        if tok is None:
+            break
+        tokens.append(tok)
+    return tokens
+
+
+top_srcdir = Path(__file__).parent.parent.parent.parent
+protocols = sorted(
+    list(Path(top_srcdir, "src").glob("**/*.x"))
+    + list(Path(Path(__file__).parent).glob("*.x"))
+)
+
+
+@pytest.mark.parametrize("path", protocols, ids=lambda p: p.name)
+def test_lexer_legacy_parity(path):
+    with path.open("r") as fp:
+        want = all_tokens(XDRLegacyLexer(fp))
+
+    with path.open("r") as fp:
+        got = all_tokens(XDRLexer(fp))
+
+    assert len(want) > 0
+    assert got == want
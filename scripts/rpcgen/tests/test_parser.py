@@ -89,3 +89,51 @@ def test_parser():
     )
 
     assert str(got) == str(want)
+
+
+def test_parser_singletons():
+    p = Path(Path(__file__).parent, "simple.x")
+    with p.open("r") as fp:
+        parser = XDRParser(fp)
+
+        spec = parser.parse()
+
+    strings = [
+        decl.typ
+        for definition in spec.definitions
+        if type(definition) is XDRDefinitionStruct
+        for decl in definition.body.fields
+        if type(decl.typ) is XDRTypeString
+    ]
+
+    assert len(strings) > 1
+    assert all([typ is XDRTypeString() for typ in strings])
+    assert XDRTypeVoid() is XDRTypeVoid()
+    assert XDRTypeVoid() is not XDRTypeString()
+
+
+def test_parser_constants():
+    p = Path(Path(__file__).parent, "simple.x")
+    with p.open("r") as fp:
+        parser = XDRParser(fp)
+
+        spec = parser.parse()
+
+    assert spec.constants == {
+        "MAXUSERNAME": 32,
+        "MAXFILELEN": 65535,
+        "MAXNAMELEN": 255,
+        "TEXT": 0,
+        "DATA": 1,
+        "EXEC": 2,
+    }
+
+    p = Path(Path(__file__).parent, "demo.x")
+    with p.open("r") as fp:
+        parser = XDRParser(fp)
+
+        spec = parser.parse()
+
+    assert spec.constants["TestConstDec"] == 25
+    assert spec.constants["TestConstHex"] == 0x27
+    assert spec.constants["TestConstOct"] == 0o31
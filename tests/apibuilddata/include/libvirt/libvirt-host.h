@@ -0,0 +1,91 @@
+/*
+ * libvirt-host.h
+ * Summary: APIs for management of hosts
+ * Description: Provides APIs for the management of hosts
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#ifndef LIBVIRT_HOST_H
+# define LIBVIRT_HOST_H
+
+/**
+ * virConnect:
+ *
+ * a virConnect is a private structure representing a connection to
+ * the Hypervisor.
+ *
+ * Since: 0.0.1
+ */
+typedef struct _virConnect virConnect;
+
+/**
+ * virConnectPtr:
+ *
+ * a virConnectPtr is pointer to a virConnect private structure, this is the
+ * type used to reference a connection to the Hypervisor in the API.
+ *
+ * Since: 0.0.1
+ */
+typedef virConnect *virConnectPtr;
+
+/**
+ * VIR_NODEINFO_MAXCPUS:
+ * @nodeinfo: virNodeInfo instance
+ *
+ * This macro is to calculate the total number of CPUs supported
+ * but not necessary active in the host.
+ *
+ * Since: 0.1.4
+ */
+# define VIR_NODEINFO_MAXCPUS(nodeinfo) ((nodeinfo).nodes*(nodeinfo).sockets*(nodeinfo).cores*(nodeinfo).threads)
+
+/**
+ * virNodeInfo:
+ *
+ * a virNodeInfo is a structure filled by virNodeGetInfo() and providing
+ * the information for the Node.
+ *
+ * Since: 0.1.0
+ */
+typedef struct _virNodeInfo virNodeInfo;
+
+struct _virNodeInfo {
+    char model[32];         /* string indicating the CPU model */
+    unsigned long memory;   /* memory size in kilobytes */
+    unsigned int cpus;      /* the number of active CPUs */
+};
+
+/**
+ * virConnectFlags:
+ *
+ * Flags when opening a connection to a hypervisor
+ *
+ * Since: 0.4.1
+ */
+typedef enum {
+    VIR_CONNECT_RO          = (1 << 0),  /* A readonly connection (Since: 0.4.1) */
+    VIR_CONNECT_NO_ALIASES  = (1 << 1),  /* Don't try to resolve URI aliases & "names" (Since: 0.9.7) */
+} virConnectFlags;
+
+/**
+ * virConnectCloseFunc:
+ * @conn: virConnect connection
+ * @reason: reason why the connection was closed (one of virConnectCloseReason)
+ * @opaque: opaque user data
+ *
+ * A callback function to be registered, and called when the connection
+ * is closed.
+ *
+ * Since: 0.10.0
+ */
+typedef void (*virConnectCloseFunc)(virConnectPtr conn,
+                                    int reason,
+                                    void *opaque);
+
+int                     virConnectGetVersion    (virConnectPtr conn,
+                                                 unsigned long *hvVer);
+int                     virNodeGetInfo          (virConnectPtr conn,
+                                                 virNodeInfoPtr info);
+
+#endif /* LIBVIRT_HOST_H */
@@ -0,0 +1,17 @@
+/*
+ * libvirt-lxc.h
+ * Summary: lxc specific interfaces
+ * Description: Provides the interfaces of the libvirt library to handle
+ *              lxc specific methods
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#ifndef LIBVIRT_LXC_H
+# define LIBVIRT_LXC_H
+
+int virDomainLxcOpenNamespace(virDomainPtr domain,
+                              int **fdlist,
+                              unsigned int flags);
+
+#endif /* LIBVIRT_LXC_H */
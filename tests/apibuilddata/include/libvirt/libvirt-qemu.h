@@ -0,0 +1,16 @@
+/*
+ * libvirt-qemu.h
+ * Summary: qemu specific interfaces
+ * Description: Provides the interfaces of the libvirt library to handle
+ *              qemu specific methods
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#ifndef LIBVIRT_QEMU_H
+# define LIBVIRT_QEMU_H
+
+int virDomainQemuMonitorCommand(virDomainPtr domain, const char *cmd,
+                                char **result, unsigned int flags);
+
+#endif /* LIBVIRT_QEMU_H */
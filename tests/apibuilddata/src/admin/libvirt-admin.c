@@ -0,0 +1,25 @@
+/*
+ * libvirt-admin.c
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#include <config.h>
+
+/**
+ * virAdmConnectOpen:
+ * @name: uri of the daemon to connect to, NULL for default
+ * @flags: bitwise-OR of virConnectFlags; so far the only supported flag is
+ *         VIR_CONNECT_NO_ALIASES
+ *
+ * Opens connection to admin interface of the daemon.
+ *
+ * Returns @virAdmConnectPtr object or NULL on error
+ *
+ * Since: 2.0.0
+ */
+virAdmConnectPtr
+virAdmConnectOpen(const char *name, unsigned int flags)
+{
+    return virAdmConnectOpenInternal(name, flags);
+}
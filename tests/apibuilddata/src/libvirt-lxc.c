@@ -0,0 +1,29 @@
+/*
+ * libvirt-lxc.c: Interfaces for the libvirt library to handle lxc-specific
+ *                 APIs.
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#include <config.h>
+
+/**
+ * virDomainLxcOpenNamespace:
+ * @domain: a domain object
+ * @fdlist: pointer to an array to be filled with FDs
+ * @flags: currently unused, pass 0
+ *
+ * This API is LXC specific, so it will only work with hypervisor
+ * connections to the LXC driver.
+ *
+ * Returns the number of opened file descriptors, or -1 on error
+ *
+ * Since: 1.0.2
+ */
+int
+virDomainLxcOpenNamespace(virDomainPtr domain,
+                          int **fdlist,
+                          unsigned int flags)
+{
+    return domain->conn->driver->domainLxcOpenNamespace(domain, fdlist, flags);
+}
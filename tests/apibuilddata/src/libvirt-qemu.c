@@ -0,0 +1,30 @@
+/*
+ * libvirt-qemu.c: Interfaces for the libvirt library to handle qemu-specific
+ *                 APIs.
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#include <config.h>
+
+/**
+ * virDomainQemuMonitorCommand:
+ * @domain: a domain object
+ * @cmd: the qemu monitor command string
+ * @result: a string returned by @cmd
+ * @flags: bitwise-or of supported virDomainQemuMonitorCommandFlags
+ *
+ * This API is QEMU specific, so it will only work with hypervisor
+ * connections to the QEMU driver.
+ *
+ * Returns 0 in case of success, -1 in case of failure
+ *
+ * Since: 0.8.3
+ */
+int
+virDomainQemuMonitorCommand(virDomainPtr domain, const char *cmd,
+                            char **result, unsigned int flags)
+{
+    return domain->conn->driver->domainQemuMonitorCommand(domain, cmd,
+                                                          result, flags);
+}
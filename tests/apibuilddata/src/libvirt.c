@@ -0,0 +1,45 @@
+/*
+ * libvirt.c: Main interfaces for the libvirt library
+ *
+ * SPDX-License-Identifier: LGPL-2.1-or-later
+ */
+
+#include <config.h>
+
+/**
+ * virConnectGetVersion:
+ * @conn: pointer to the hypervisor connection
+ * @hvVer: return value for the version of the running hypervisor (OUT)
+ *
+ * Get the version level of the Hypervisor running.
+ *
+ * Returns -1 in case of error, 0 otherwise. if the version can't be
+ *    extracted by lack of capacities returns 0 and @hvVer is 0, otherwise
+ *    @hvVer value is major * 1,000,000 + minor * 1,000 + release
+ *
+ * Since: 0.0.3
+ */
+int
+virConnectGetVersion(virConnectPtr conn, unsigned long *hvVer)
+{
+    return conn->driver->connectGetVersion(conn, hvVer);
+}
+
+
+/**
+ * virNodeGetInfo:
+ * @conn: pointer to the hypervisor connection
+ * @info: pointer to a virNodeInfo structure allocated by the user
+ *
+ * Extract hardware information about the node, where 'memory' is
+ * reported in kilobytes & "cpus" counts the <active> ones.
+ *
+ * Returns 0 in case of success and -1 in case of failure.
+ *
+ * Since: 0.1.0
+ */
+int
+virNodeGetInfo(virConnectPtr conn, virNodeInfoPtr info)
+{
+    return conn->driver->nodeGetInfo(conn, info);
+}
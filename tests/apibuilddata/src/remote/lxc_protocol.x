@@ -0,0 +1,7 @@
+enum lxc_procedure {
+    /**
+     * @generate: none
+     * @acl: domain:open_namespace
+     */
+    LXC_PROC_DOMAIN_OPEN_NAMESPACE = 1
+};
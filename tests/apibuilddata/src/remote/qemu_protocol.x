@@ -0,0 +1,7 @@
+enum qemu_procedure {
+    /**
+     * @generate: none
+     * @acl: domain:write
+     */
+    QEMU_PROC_DOMAIN_MONITOR_COMMAND = 1
+};
@@ -0,0 +1,13 @@
+enum remote_procedure {
+    /**
+     * @generate: both
+     * @acl: connect:read
+     */
+    REMOTE_PROC_CONNECT_GET_VERSION = 1,
+
+    /**
+     * @generate: both
+     * @acl: connect:read
+     */
+    REMOTE_PROC_NODE_GET_INFO = 2
+};